@@ -0,0 +1,342 @@
+# analytics.py
+# 成績統計：每位學生 / 每個模式 / 每天的平均正確率與百分位數，給老師看趨勢與分布。
+# 以 cursor 分批讀取 scores，記憶體只跟每批筆數與「組數 × 不同正確率」有關，跟總筆數無關。
+#
+#   python analytics.py --by username mode day username,day --percentiles 25 50 90
+#
+# 讀取時由 SQLite 把 (學生, 模式, 日期, 正確率) 編成一個整數，每筆只產生一個 Python 物件；
+# 有安裝 NumPy 時每批轉成 int64 陣列，以位元遮罩 + np.unique 一次算完各組的次數分布，
+# 沒有 NumPy 時改用 collections.Counter 對同一欄整數計數 (同樣在 C 裡完成，不逐列寫 Python 迴圈)。
+#
+#   python analytics.py --answers --by word --limit 0     # 每個單字的作答次數與答對率 (answer_events)
+#   python analytics.py --answers --response-time --by word
+import math
+from array import array
+from collections import Counter
+from itertools import chain
+from datetime import date, timedelta
+
+from models import db_connections
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 是選用套件
+    np = None
+
+ANALYTICS_CHUNK = 200_000   # 每次從資料庫讀幾筆
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+# 正確率以 0.01% 為單位取整後計數：每組最多 10001 種值，平均的誤差不超過 0.005%
+VALUE_SCALE = 100
+VALUE_SQL = "CAST(s.percent * 100 + 0.5 AS INTEGER)"
+VALUE_BITS = 14
+
+# 可用的分組欄位：(在整數鍵中佔幾個 bit, 起始位置)。代碼 0 一律代表 NULL。
+# username / mode 由暫存表換成 1 開始的代碼；day 取本機時間字串的日期 (與 STATS_PERIOD_KEYS 相同)，
+# 換成 1970-01-01 起算的第幾天 (1 = 1970-01-01)
+DIMENSIONS = {
+    "day": (17, VALUE_BITS),
+    "mode": (8, VALUE_BITS + 17),
+    "username": (20, VALUE_BITS + 17 + 8),
+}
+_EPOCH = date(1970, 1, 1)
+
+# 作答紀錄 (answer_events) 的分組欄位：哪些單字最常答錯、答得最慢
+ANSWER_DIMENSIONS = {
+    "word": (20, VALUE_BITS),
+    "mode": (8, VALUE_BITS + 20),
+    "username": (20, VALUE_BITS + 20 + 8),
+}
+# 作答紀錄可統計的值：名稱 → (SQL, 結果的除數, 額外條件)
+# correct：答對記成 10000 (= 100.00%)，平均就是答對率；response：反應時間以 RESPONSE_UNIT_MS 為單位，
+# 超過 VALUE_BITS 能表示的上限 (約 163 秒) 就算成上限
+RESPONSE_UNIT_MS = 10
+ANSWER_VALUES = {
+    "correct": ("(s.correct != 0) * 10000", VALUE_SCALE, None),
+    "response": (f"max(min(s.response_ms / {RESPONSE_UNIT_MS}, {(1 << VALUE_BITS) - 1}), 0)",
+                 1 / RESPONSE_UNIT_MS, "s.response_ms IS NOT NULL"),
+}
+
+
+def _ordered(dims, dimensions):
+    """依在整數鍵中的位置由高到低排列，與整數鍵的大小順序一致"""
+    return tuple(sorted(dims, key=lambda d: -dimensions[d][1]))
+
+
+# ==========================================
+# 分組累計
+# ==========================================
+class GroupedHistogram:
+    """
+    一種分組方式 (例如 ("username", "day")) 的累計結果：每個整數鍵出現幾次，
+    整數鍵只保留這個分組的欄位與正確率 (其他欄位的 bit 清成 0)。
+    NumPy：排序過的 keys / counts 兩個陣列，每批以 np.unique 合併；純 Python：Counter。
+    平均與百分位數都由這張次數表算出，所以結果跟分批大小、讀取順序無關。
+    """
+    def __init__(self, dims, dimensions=DIMENSIONS):
+        self.dimensions = dimensions
+        self.dims = _ordered(dims, dimensions)
+        self.mask = (1 << VALUE_BITS) - 1
+        for d in self.dims:
+            bits, shift = dimensions[d]
+            self.mask |= ((1 << bits) - 1) << shift
+        self.cells = Counter()
+        self.keys = self.counts = None
+
+    def add(self, keys):
+        """keys 是一批資料的整數鍵：NumPy int64 陣列或 array('q')"""
+        if isinstance(keys, array):
+            self.cells.update(map(self.mask.__and__, keys))
+            return
+        uniq, counts = np.unique(keys & self.mask, return_counts=True)
+        if self.keys is None:
+            self.keys, self.counts = uniq, counts
+        else:
+            self.keys, inverse = np.unique(np.concatenate([self.keys, uniq]), return_inverse=True)
+            self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts])).astype(np.int64)
+
+    def _summarize(self, percentiles):
+        """回傳 (各組的整數鍵, 筆數, 正確率×100 的總和, {p: 百分位數×100})，依鍵排序"""
+        value_mask = (1 << VALUE_BITS) - 1
+        if self.keys is not None:
+            groups, values, counts = self.keys >> VALUE_BITS, self.keys & value_mask, self.counts
+            starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+            n = np.add.reduceat(counts, starts)
+            sums = np.add.reduceat(values * counts, starts)
+            cum = np.cumsum(counts)
+            before = cum[starts] - counts[starts]
+            picks = {}
+            for p in percentiles:
+                rank = np.maximum(1, np.ceil(p / 100 * n)).astype(np.int64)
+                picks[p] = values[np.searchsorted(cum, before + rank)].tolist()
+            return groups[starts].tolist(), n.tolist(), sums.tolist(), picks
+
+        group_keys, n, sums, picks = [], [], [], {p: [] for p in percentiles}
+        hist = []
+        for key in sorted(self.cells) + [None]:  # 同一組的鍵相鄰，且依正確率由低到高；None 收尾
+            group = None if key is None else key >> VALUE_BITS
+            if hist and group != group_keys[-1]:
+                count = sum(c for _, c in hist)
+                n.append(count)
+                sums.append(sum(v * c for v, c in hist))
+                for p in percentiles:
+                    rank, seen = max(1, math.ceil(p / 100 * count)), 0
+                    for v, c in hist:
+                        seen += c
+                        if seen >= rank:
+                            picks[p].append(v)
+                            break
+                hist = []
+            if key is None:
+                break
+            if not hist:
+                group_keys.append(group)
+            hist.append((key & value_mask, self.cells[key]))
+        return group_keys, n, sums, picks
+
+    def results(self, decoders, percentiles=DEFAULT_PERCENTILES, scale=VALUE_SCALE):
+        """
+        每組一個字典：key (單一欄位時是值，多個欄位時是 tuple)、count、mean、p<百分位數>；
+        百分位數用 nearest-rank (排序後第 ceil(p/100 × n) 筆)。mean 與百分位數是計數的值除以 scale。
+        代碼依值排序，所以結果已依 key 排序 (NULL 在最前面)。
+        """
+        group_keys, n, sums, picks = self._summarize(percentiles)
+        columns = []
+        for d in self.dims:
+            bits, shift = self.dimensions[d]
+            decode = decoders[d]
+            cache = {}
+            codes = (((g << VALUE_BITS) >> shift) & ((1 << bits) - 1) for g in group_keys)
+            columns.append([cache[c] if c in cache else cache.setdefault(c, decode(c)) for c in codes])
+        keys = columns[0] if len(columns) == 1 else list(zip(*columns))
+        names = [f"p{p:g}" for p in percentiles]
+        return [dict(key=key, count=count, mean=total / count / scale,
+                     **{name: pick[i] / scale for name, pick in zip(names, picks.values())})
+                for i, (key, count, total) in enumerate(zip(keys, n, sums))]
+
+
+def _day_from_code(code):
+    return None if code == 0 else (_EPOCH + timedelta(days=code - 1)).isoformat()
+
+
+def _load_codes(conn, table, dim, bits):
+    """把 table 裡出現過的 username / mode / word 編成代碼 (暫存表，只在這條連線上)；回傳 代碼 → 值 的函式"""
+    codes = f"temp.analytics_{table}_{dim}"
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS analytics_{table}_{dim} "
+                 "(value TEXT PRIMARY KEY, code INTEGER NOT NULL)")
+    with conn:
+        conn.execute(f"DELETE FROM {codes}")
+        # DISTINCT 走以該欄位開頭的索引 (scores 的 username / mode、answer_events 的 username)，
+        # 其他欄位 (例如 word) 才需要掃描一次資料表
+        # 代碼依值排序：整數鍵的大小順序就是結果的排序，不必再排一次
+        conn.execute(f"INSERT INTO {codes} SELECT {dim}, ROW_NUMBER() OVER (ORDER BY {dim}) "
+                     f"FROM (SELECT DISTINCT {dim} FROM {table} WHERE {dim} IS NOT NULL)")
+    values = [None] + [v for v, in conn.execute(f"SELECT value FROM {codes} ORDER BY code")]
+    if len(values) > 1 << bits:
+        raise OverflowError(f"{dim} 超過 {(1 << bits) - 1} 種值")
+    return values.__getitem__
+
+
+def _iter_keys(table, dimensions, dims, value_sql, where, params, chunk_size, vectorized):
+    """iter_score_keys / iter_answer_keys 共用：組出把一列編成整數鍵的 SQL，再分批讀取"""
+    conn = db_connections.get()
+    decoders, joins, parts = {"day": _day_from_code}, [], [value_sql]
+    for d in dims:
+        bits, shift = dimensions[d]
+        if d == "day":
+            # julianday('1970-01-01') 取整數是 2440587，所以 1970-01-01 編成 1，NULL 或壞掉的日期是 0
+            parts.append(f"(max(coalesce(CAST(julianday(substr(s.time, 1, 10)) AS INTEGER) - 2440586, 0), 0)"
+                         f" << {shift})")
+        else:
+            decoders[d] = _load_codes(conn, table, d, bits)
+            joins.append(f"LEFT JOIN temp.analytics_{table}_{d} AS a_{d} ON a_{d}.value = s.{d}")
+            parts.append(f"(coalesce(a_{d}.code, 0) << {shift})")
+    sql = (f"SELECT {' | '.join(parts)} FROM {table} AS s {' '.join(joins)} "
+           f"WHERE {' AND '.join(where) or '1'}")
+    yield decoders
+    cursor = conn.execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            keys = chain.from_iterable(rows)  # 每列只有一個欄位
+            yield np.fromiter(keys, dtype=np.int64, count=len(rows)) if vectorized else array("q", keys)
+    finally:
+        cursor.close()
+
+
+def _grouped_stats(groupings, dimensions, percentiles, scale, use_numpy, iter_keys):
+    """檢查分組欄位，一次掃描 (iter_keys(dims, vectorized)) 同時累計每一種分組"""
+    groupings = [tuple(g) for g in groupings]
+    for g in groupings:
+        unknown = set(g) - dimensions.keys()
+        if unknown or not g:
+            raise ValueError(f"不支援的分組欄位：{', '.join(sorted(unknown)) or '(空)'}")
+    vectorized = (np is not None) if use_numpy is None else use_numpy
+    if vectorized and np is None:
+        raise RuntimeError("沒有安裝 NumPy")
+
+    dims = _ordered({d for g in groupings for d in g}, dimensions)
+    histograms = [GroupedHistogram(g, dimensions) for g in groupings]
+    chunks = iter_keys(dims, vectorized)
+    decoders = next(chunks)
+    for keys in chunks:
+        for h in histograms:
+            h.add(keys)
+    return {"+".join(h.dims): h.results(decoders, percentiles, scale) for h in histograms}
+
+
+# ==========================================
+# 主要介面
+# ==========================================
+def iter_score_keys(dims, mode_filter=None, since=None, chunk_size=ANALYTICS_CHUNK, vectorized=False):
+    """
+    分批讀取 scores，每批回傳一欄整數鍵 (vectorized 時是 NumPy int64 陣列，否則是 array('q'))。
+    dims 是要編進鍵的分組欄位；since 是 epoch 秒 (走 ts 索引)。第一個回傳值是 {欄位: 代碼 → 值}。
+    """
+    where, params = ["s.percent IS NOT NULL"], []
+    if mode_filter:
+        where.append("s.mode=?")
+        params.append(mode_filter)
+    if since is not None:
+        where.append("s.ts>=?")
+        params.append(int(since))
+    return _iter_keys("scores", DIMENSIONS, dims, VALUE_SQL, where, params, chunk_size, vectorized)
+
+
+def score_stats(groupings=(("username",), ("mode",), ("day",)), percentiles=DEFAULT_PERCENTILES,
+                mode_filter=None, since=None, chunk_size=ANALYTICS_CHUNK, use_numpy=None):
+    """
+    一次掃描 scores，同時算出多種分組的筆數、平均正確率與百分位數。
+    groupings 的每一項是 DIMENSIONS 鍵的 tuple，例如 ("username", "day") 是每位學生每天的趨勢。
+    use_numpy=None 表示有 NumPy 就用。回傳 {"username+day": [每組的字典, ...], ...}。
+    """
+    return _grouped_stats(groupings, DIMENSIONS, percentiles, VALUE_SCALE, use_numpy,
+                          lambda dims, vectorized: iter_score_keys(dims, mode_filter, since,
+                                                                   chunk_size, vectorized))
+
+
+def iter_answer_keys(dims, value="correct", mode_filter=None, since=None,
+                     chunk_size=ANALYTICS_CHUNK, vectorized=False):
+    """與 iter_score_keys 相同，改讀 answer_events；value 是 ANSWER_VALUES 的鍵"""
+    value_sql, _, condition = ANSWER_VALUES[value]
+    where, params = [condition] if condition else [], []
+    if mode_filter:
+        where.append("s.mode=?")
+        params.append(mode_filter)
+    if since is not None:
+        where.append("s.time>=?")
+        params.append(float(since))
+    return _iter_keys("answer_events", ANSWER_DIMENSIONS, dims, value_sql, where, params,
+                      chunk_size, vectorized)
+
+
+def answer_stats(groupings=(("word",),), value="correct", percentiles=(),
+                 mode_filter=None, since=None, chunk_size=ANALYTICS_CHUNK, use_numpy=None):
+    """
+    一次掃描 answer_events (每一次作答)，依 ANSWER_DIMENSIONS 分組，例如 ("word",) 是每個單字。
+    value="correct"：mean 是答對率 (%)；value="response"：mean 與百分位數是反應時間 (毫秒)，
+    沒有記錄反應時間的作答不計入。回傳格式與 score_stats 相同。
+    """
+    if value not in ANSWER_VALUES:
+        raise ValueError(f"不支援的統計值：{value}（可用：{', '.join(ANSWER_VALUES)}）")
+    return _grouped_stats(groupings, ANSWER_DIMENSIONS, percentiles, ANSWER_VALUES[value][1], use_numpy,
+                          lambda dims, vectorized: iter_answer_keys(dims, value, mode_filter, since,
+                                                                    chunk_size, vectorized))
+
+
+# ==========================================
+# 命令列：python analytics.py
+# ==========================================
+def main(argv=None):
+    import argparse
+    import json
+    from datetime import datetime
+    from models import DBManager
+
+    parser = argparse.ArgumentParser(description="英文單字學習系統 - 成績統計")
+    parser.add_argument("--by", nargs="+", default=None,
+                        help="分組方式，多個欄位以逗號連接，例如 username,day "
+                             "(預設 username mode day；--answers 時預設 word)")
+    parser.add_argument("--percentiles", type=float, nargs="+", default=list(DEFAULT_PERCENTILES))
+    parser.add_argument("--mode", help="只統計某個模式")
+    parser.add_argument("--since", help="只統計這一天 (YYYY-MM-DD) 之後的成績")
+    parser.add_argument("--answers", action="store_true",
+                        help="改統計每一次作答 (answer_events)：可依 word / username / mode 分組，顯示答對率")
+    parser.add_argument("--response-time", action="store_true",
+                        help="搭配 --answers：改算反應時間 (毫秒) 的平均與百分位數")
+    parser.add_argument("--limit", type=int, default=20, help="每種分組最多印幾組 (0 = 全部)")
+    parser.add_argument("--json", help="把完整結果另存成 JSON")
+    parser.add_argument("--no-numpy", action="store_true", help="不使用 NumPy")
+    args = parser.parse_args(argv)
+    if args.response_time and not args.answers:
+        parser.error("--response-time 需要搭配 --answers")
+
+    DBManager.init_db()
+    since = datetime.strptime(args.since, "%Y-%m-%d").timestamp() if args.since else None
+    use_numpy = False if args.no_numpy else None
+    if args.answers:
+        groupings = [g.split(",") for g in args.by or ["word"]]
+        percentiles = args.percentiles if args.response_time else []
+        value = "response" if args.response_time else "correct"
+        result = answer_stats(groupings, value, percentiles, args.mode, since, use_numpy=use_numpy)
+        label, unit = ("平均", "ms") if args.response_time else ("答對率", "%")
+    else:
+        groupings = [g.split(",") for g in args.by or ["username", "mode", "day"]]
+        percentiles = args.percentiles
+        result = score_stats(groupings, percentiles, args.mode, since, use_numpy=use_numpy)
+        label, unit = "平均", "%"
+    for name, rows in result.items():
+        print(f"== {name} ({len(rows)} 組)")
+        for r in rows[:args.limit or None]:
+            key = " / ".join(map(str, r["key"])) if isinstance(r["key"], tuple) else r["key"]
+            quantiles = "  ".join(f"p{p:g} {r[f'p{p:g}']:6.2f}" for p in percentiles)
+            print(f"  {key!s:<28} n={r['count']:<8} {label} {r['mean']:6.2f}{unit}  {quantiles}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1271 @@
+# benchmark.py
+"""
+效能測試腳本（不影響正式的 quiz_system.db，全部在暫存資料夾進行）
+
+用法：
+    python benchmark.py connections [--ops 2000]
+    python benchmark.py indexes [--rows 2000000]
+    python benchmark.py startup [--max-import-ms 0]
+    python benchmark.py distractors [--sizes 100 10000 1000000]
+    python benchmark.py distractor-index [--sizes 100 10000 1000000]
+    python benchmark.py sampling [--sizes 10000 100000 1000000]
+    python benchmark.py reviews [--rows 2000000]
+    python benchmark.py match-board [--sizes 50 500 5000]
+    python benchmark.py ranking-pages [--rows 2000000]
+    python benchmark.py leaderboard-cache [--students 40 --rounds 10]
+    python benchmark.py ranking-views [--rows 2000000]
+    python benchmark.py sessions [--sessions 5000]
+    python benchmark.py load [--clients 60 200] [--processes 0 4] [--impl pooled legacy]
+    python benchmark.py sync [--machines 4] [--scores 500]
+    python benchmark.py login [--costs 10000 100000 200000 600000] [--users 40] [--threads 8]
+    python benchmark.py transfer [--users 2000] [--rows 50000 200000]
+    python benchmark.py analytics [--rows 1000000] [--baseline-max 1000000]
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import models
+from models import DBManager, UserSession
+
+
+# ==========================================
+# 共用工具
+# ==========================================
+def use_temp_db(name="bench.db"):
+    """把 models.DB_NAME 指到暫存檔，回傳路徑"""
+    folder = tempfile.mkdtemp(prefix="quiz_bench_")
+    path = os.path.join(folder, name)
+    models.DB_NAME = path
+    models.db_connections.close_all()
+    DBManager.top_scores_cache.clear()
+    return path
+
+
+def report(title, ops, elapsed):
+    rate = ops / elapsed if elapsed > 0 else float("inf")
+    print(f"  {title:<28} {ops:>8} ops  {elapsed:8.3f}s  {rate:>12,.0f} ops/sec")
+    return rate
+
+
+# ==========================================
+# 舊版：每次呼叫都 connect / close（作為對照組）
+# ==========================================
+class LegacyDBManager:
+    @staticmethod
+    def register_user(username, pwd_hash):
+        conn = sqlite3.connect(models.DB_NAME)
+        c = conn.cursor()
+        try:
+            c.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, pwd_hash))
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+        finally:
+            conn.close()
+
+    @staticmethod
+    def verify_user(username, pwd_hash):
+        conn = sqlite3.connect(models.DB_NAME)
+        c = conn.cursor()
+        c.execute("SELECT * FROM users WHERE username=? AND password=?", (username, pwd_hash))
+        result = c.fetchone()
+        conn.close()
+        return result is not None
+
+    @staticmethod
+    def save_score(user, mode, score, total):
+        percent = (score / total * 100) if total > 0 else 0
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn = sqlite3.connect(models.DB_NAME)
+        c = conn.cursor()
+        c.execute("INSERT INTO scores (username, mode, score, total, percent, time) VALUES (?, ?, ?, ?, ?, ?)",
+                  (user, mode, score, total, percent, timestamp))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def get_top_scores(mode_filter=None, limit=20):
+        conn = sqlite3.connect(models.DB_NAME)
+        c = conn.cursor()
+        query = "SELECT username, mode, score, total, percent, time FROM scores"
+        params = []
+        if mode_filter:
+            query += " WHERE mode=?"
+            params.append(mode_filter)
+        query += " ORDER BY percent DESC, score DESC LIMIT ?"
+        params.append(limit)
+        c.execute(query, tuple(params))
+        results = c.fetchall()
+        conn.close()
+        return results
+
+
+# ==========================================
+# connections：連線池 vs. 每次重新連線
+# ==========================================
+def bench_connections(args):
+    use_temp_db()
+    DBManager.init_db()
+    DBManager.register_user("bench", "pw")
+    UserSession().login("bench")
+    pwd_hash = models.hashlib.sha256(b"pw").hexdigest()
+    n = args.ops
+
+    print(f"[connections] DB = {models.DB_NAME}")
+    cases = [
+        ("verify_user",
+         lambda: LegacyDBManager.verify_user("bench", pwd_hash),
+         lambda: DBManager.verify_user("bench", "pw")),
+        ("save_score",
+         lambda: LegacyDBManager.save_score("bench", "填空", 4, 5),
+         lambda: DBManager.save_score("填空", 4, 5)),
+        ("get_top_scores",
+         lambda: LegacyDBManager.get_top_scores("填空"),
+         lambda: (DBManager.top_scores_cache.clear(), DBManager.get_top_scores("填空"))),
+    ]
+    for name, legacy, pooled in cases:
+        print(f"- {name}")
+        start = time.perf_counter()
+        for _ in range(n):
+            legacy()
+        old = report("connect-per-call", n, time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(n):
+            pooled()
+        new = report("thread-local connection", n, time.perf_counter() - start)
+        print(f"  speedup: {new / old:.1f}x")
+
+
+# ==========================================
+# indexes：舊版資料庫就地升級 + 查詢計畫檢查
+# ==========================================
+MODES = ["填空", "選擇題", "連連看"]
+
+
+def seed_scores(conn, rows, users=500, seed=42, batch=50000):
+    """以固定亂數種子灌入大量成績，結果可重現"""
+    rnd = random.Random(seed)
+    done = 0
+    while done < rows:
+        n = min(batch, rows - done)
+        data = []
+        for _ in range(n):
+            total = 5
+            score = rnd.randint(0, total)
+            data.append((f"user{rnd.randrange(users)}", rnd.choice(MODES), score, total,
+                         score / total * 100,
+                         f"2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} "
+                         f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:00"))
+        with conn:
+            conn.executemany("INSERT INTO scores (username, mode, score, total, percent, time) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", data)
+        done += n
+
+
+def top_scores_plan(conn, mode_filter):
+    """回傳 get_top_scores 查詢 (超過 leaderboard 筆數時) 的 EXPLAIN QUERY PLAN 文字"""
+    if mode_filter:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + DBManager.TOP_SCORES_MODE_SQL,
+                            (mode_filter, 20)).fetchall()
+    else:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + DBManager.TOP_SCORES_ALL_SQL, (20,)).fetchall()
+    return [r[-1] for r in rows]
+
+
+def check_top_scores_plan(conn):
+    """兩種排行榜查詢都必須依索引順序讀取，不能有額外排序 (TEMP B-TREE)"""
+    for mode_filter in ("填空", None):
+        plan = top_scores_plan(conn, mode_filter)
+        text = " | ".join(plan)
+        assert any("INDEX" in step for step in plan), f"沒有使用索引：{text}"
+        assert not any("TEMP B-TREE" in step for step in plan), f"仍需要額外排序：{text}"
+        print(f"  plan ({mode_filter or '全部'}): {text}")
+
+
+def time_top_scores(repeat, get_top_scores=DBManager.get_top_scores):
+    """每次都清掉查詢快取，量的是實際查詢資料庫的時間"""
+    start = time.perf_counter()
+    for i in range(repeat):
+        DBManager.top_scores_cache.clear()
+        get_top_scores(MODES[i % len(MODES)] if i % 4 else None)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_indexes(args):
+    use_temp_db()
+    conn = models.db_connections.get()
+    # 模擬舊版 quiz_system.db：只有第一版的資料表、沒有索引
+    models.SCHEMA_MIGRATIONS[0](conn)
+    conn.execute("PRAGMA user_version=1")
+    conn.commit()
+
+    print(f"[indexes] seeding {args.rows:,} rows into {models.DB_NAME}")
+    start = time.perf_counter()
+    seed_scores(conn, args.rows)
+    print(f"  seeded in {time.perf_counter() - start:.1f}s")
+
+    # 舊版資料庫還沒有 leaderboard 表，用舊版查詢量升級前的速度
+    before = time_top_scores(args.repeat, LegacyDBManager.get_top_scores)
+    print(f"  before: get_top_scores {before:8.3f} ms/query")
+    print(f"  plan (全部): {' | '.join(top_scores_plan(conn, None))}")
+
+    start = time.perf_counter()
+    DBManager.init_db()
+    print(f"  in-place upgrade to v{DBManager.schema_version()} took "
+          f"{time.perf_counter() - start:.1f}s")
+    check_top_scores_plan(conn)
+    print(f"  after:  get_top_scores {time_top_scores(args.repeat):8.3f} ms/query")
+
+
+# ==========================================
+# startup：匯入時間 (python -X importtime) 與第一個視窗出現的時間
+# ==========================================
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+FIRST_WINDOW_SNIPPET = """
+import sys, time
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import models
+from windows_quiz import LoginDialog
+models.DB_NAME = sys.argv[2]
+models.DBManager.init_db()
+dlg = LoginDialog()
+dlg.show()
+app.processEvents()
+print(time.time() - float(sys.argv[1]))
+print("google.generativeai" in sys.modules)
+"""
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 輸出，回傳 [(cumulative_us, self_us, module), ...]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def bench_startup(args):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                          cwd=HERE, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        return 1
+    rows = parse_importtime(proc.stderr)
+    # 最外層 (縮排最少) 的模組加總就是整體匯入時間
+    total_ms = sum(c for c, _, name in rows if not name.startswith("  ")) / 1000
+    print(f"[startup] import main: {total_ms:.1f} ms  ({len(rows)} modules)")
+    print(f"  top {args.top} by cumulative time:")
+    for cumulative, _, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:9.1f} ms  {name.strip()}")
+    ai_loaded = any(name.strip() == "google.generativeai" for _, _, name in rows)
+    print(f"  google.generativeai imported at startup: {ai_loaded}")
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="quiz_bench_"), "startup.db")
+    proc = subprocess.run([sys.executable, "-c", FIRST_WINDOW_SNIPPET, repr(time.time()), db_path],
+                          cwd=HERE, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        return 1
+    elapsed, ai_loaded_window = proc.stdout.split()[-2:]
+    print(f"  wall-clock to first window: {float(elapsed) * 1000:.1f} ms "
+          f"(AI SDK loaded: {ai_loaded_window})")
+
+    failed = ai_loaded or ai_loaded_window == "True"
+    if args.max_import_ms and total_ms > args.max_import_ms:
+        print(f"  REGRESSION: import time {total_ms:.1f} ms > {args.max_import_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+# ==========================================
+# distractors：選擇題干擾選項抽樣 (舊版 O(N) vs. 索引抽樣 O(k))
+# ==========================================
+def make_bank(size, seed=7):
+    """產生指定大小的假題庫：en 不重複"""
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [{"en": "".join(rnd.choice(letters) for _ in range(6)) + str(i), "zh": f"詞{i}", "id": i}
+            for i in range(size)]
+
+
+def legacy_distractors(words, correct):
+    """改版前 ChoiceQuizStrategy 每一題的作法"""
+    pool = [w["en"] for w in words if w["en"] != correct]
+    random.shuffle(pool)
+    return pool[:3]
+
+
+def bench_distractors(args):
+    print("[distractors] per-question distractor sampling")
+    for size in args.sizes:
+        bank = make_bank(size)
+        targets = [bank[random.randrange(size)]["en"] for _ in range(args.questions)]
+        # 舊版在大題庫非常慢，只跑少量題目估計
+        legacy_n = max(1, min(args.questions, 2_000_000 // size))
+        start = time.perf_counter()
+        for correct in targets[:legacy_n]:
+            legacy_distractors(bank, correct)
+        old = (time.perf_counter() - start) / legacy_n * 1e6
+        start = time.perf_counter()
+        for correct in targets:
+            models.sample_distractors(bank, correct, 3)
+        new = (time.perf_counter() - start) / len(targets) * 1e6
+        print(f"  bank={size:>9,}  filter+shuffle {old:12.1f} us/q   "
+              f"index sample {new:8.2f} us/q   speedup {old / new:,.0f}x")
+
+
+def bench_distractor_index(args):
+    print("[distractor-index] similarity index build + ChoiceQuizStrategy(5 題)")
+    for size in args.sizes:
+        bank = make_bank(size)
+        for i, w in enumerate(bank):
+            w["unit"] = i % 12
+        start = time.perf_counter()
+        models.get_distractor_index(bank)
+        build = time.perf_counter() - start
+        strategy = models.ChoiceQuizStrategy(bank)
+        strategy.generate_questions(5)
+        start = time.perf_counter()
+        for _ in range(args.quizzes):
+            strategy.generate_questions(5)
+        per_quiz = (time.perf_counter() - start) / args.quizzes * 1000
+        print(f"  bank={size:>9,}  index build {build:7.2f}s   quiz {per_quiz:7.3f} ms")
+
+
+# ==========================================
+# sampling：get_quiz_questions 抽題 (copy+shuffle vs. O(k) 抽樣)
+# ==========================================
+def legacy_quiz_questions(words, num_questions):
+    """改版前的 get_quiz_questions"""
+    words_copy = words.copy()
+    random.shuffle(words_copy)
+    return words_copy[: min(num_questions, len(words_copy))]
+
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_sampling(args):
+    print("[sampling] 5 questions per quiz, ms per call")
+    for size in args.sizes:
+        bank = make_bank(size)
+        for i, w in enumerate(bank):
+            w["unit"] = i % 10
+        recent = {bank[i]["en"] for i in range(0, size, max(1, size // 30))}
+        old = time_per_call(lambda: legacy_quiz_questions(bank, 5), max(1, args.repeat // 20))
+        new = time_per_call(lambda: models.get_quiz_questions(5, bank), args.repeat)
+        flt = time_per_call(lambda: models.get_quiz_questions(5, bank, unit=3, exclude=recent),
+                            args.repeat)
+        print(f"  list bank={size:>9,}  copy+shuffle {old:9.3f}   sample {new:7.4f}   "
+              f"unit+exclude {flt:7.4f}")
+
+        use_temp_db()
+        DBManager.init_db()
+        models.vocabulary.import_words(dict(w, tags=[f"set{w['unit'] % 3}"]) for w in bank)
+        new = time_per_call(lambda: models.get_quiz_questions(5), args.repeat)
+        flt = time_per_call(lambda: models.get_quiz_questions(5, unit=3, exclude=recent), args.repeat)
+        tag = time_per_call(lambda: models.vocabulary.sample(5, tag="set1"), args.repeat)
+        print(f"  db   bank={models.vocabulary.count():>9,}  "
+              f"sample {new:7.4f}   unit+exclude {flt:7.4f}   tag {tag:7.4f}")
+
+
+# ==========================================
+# reviews：間隔複習「到期單字」查詢 (username, due 索引)
+# ==========================================
+def bench_reviews(args):
+    use_temp_db()
+    DBManager.init_db()
+    conn = models.db_connections.get()
+    rnd = random.Random(3)
+    now = time.time()
+    print(f"[reviews] seeding {args.rows:,} review rows for {args.users} users")
+    done = 0
+    while done < args.rows:
+        n = min(50000, args.rows - done)
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO review_state (username, word, zh, due) VALUES (?, ?, ?, ?)",
+                ((f"user{rnd.randrange(args.users)}", f"word{done + i}", "字",
+                  now + rnd.uniform(-30, 30) * 86400) for i in range(n)))
+        done += n
+    plan = " | ".join(r[-1] for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT word, zh FROM review_state WHERE username=? AND due<=? "
+        "ORDER BY due LIMIT ?", ("user1", now, 5)))
+    print(f"  plan: {plan}")
+    assert "idx_review_due" in plan and "TEMP B-TREE" not in plan, plan
+    users = [f"user{i}" for i in range(args.users)]
+    per_call = time_per_call(lambda: DBManager.get_due_reviews(rnd.choice(users), 5), args.repeat)
+    print(f"  get_due_reviews: {per_call:.4f} ms")
+    per_call = time_per_call(
+        lambda: DBManager.record_review(rnd.choice(users), f"word{rnd.randrange(args.rows)}", "字",
+                                        rnd.random() < 0.8), args.repeat)
+    print(f"  record_review:   {per_call:.4f} ms")
+    models.UserSession().login(users[0])
+    per_call = time_per_call(lambda: models.SpacedRepetitionStrategy().generate_questions(5),
+                             args.repeat)
+    print(f"  SpacedRepetitionStrategy.generate_questions(5): {per_call:.4f} ms")
+
+
+# ==========================================
+# match-board：連連看 QListWidget vs. QListView + model 的載入時間與記憶體
+# ==========================================
+MATCH_BOARD_SNIPPET = """
+import os, sys, time
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt
+app = QApplication(sys.argv)
+import benchmark, models
+from windows_quiz import MatchQuizWindow, LargeMatchQuizWindow
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+kind, size, clicks = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+benchmark.use_temp_db()
+models.DBManager.init_db()
+models.vocabulary.import_words(benchmark.make_bank(size))
+models.UserSession().login("bench")
+cls = LargeMatchQuizWindow if kind == "model" else MatchQuizWindow
+app.processEvents()
+
+rss_before = rss_kb()
+start = time.perf_counter()
+win = cls(num_questions=size)
+win.show()
+app.processEvents()
+load_ms = (time.perf_counter() - start) * 1000
+rss_after = rss_kb()
+
+# 連續配對 clicks 組 (不配完，避免跳出結算視窗)，每次都讓畫面重繪
+if kind == "model":
+    pick = lambda pid: (win.left_model.index(win.left_model.row_of[pid]),
+                        win.right_model.index(win.right_model.row_of[pid]))
+else:
+    right_rows = {win.list_right.item(r).data(Qt.UserRole): r for r in range(win.list_right.count())}
+    pick = lambda pid: (win.list_left.item(pid), win.list_right.item(right_rows[pid]))
+start = time.perf_counter()
+for pid in range(clicks):
+    win.left_selected, win.right_selected = pick(pid)
+    win.check_pair()
+    win.repaint()
+    app.processEvents()
+match_ms = (time.perf_counter() - start) / clicks * 1000
+print(load_ms, (rss_after - rss_before) / 1024, match_ms)
+models.answer_log.close()
+"""
+
+
+def bench_match_board(args):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    print("[match-board] load = 建立視窗到第一次繪製完成；match = 每次配對 + 重繪")
+    for size in args.sizes:
+        for kind, label in [("widget", "QListWidget"), ("model", "QListView+model")]:
+            clicks = min(args.clicks, size - 1)
+            proc = subprocess.run([sys.executable, "-c", MATCH_BOARD_SNIPPET, kind, str(size), str(clicks)],
+                                  cwd=HERE, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(proc.stderr[-2000:])
+                return 1
+            load_ms, rss_mb, match_ms = map(float, proc.stdout.split()[-3:])
+            print(f"  pairs={size:>5}  {label:<16} load {load_ms:9.1f} ms   "
+                  f"rss +{rss_mb:6.1f} MB   match {match_ms:6.2f} ms")
+
+
+# ==========================================
+# ranking-pages：排行榜 keyset 分頁，每一頁的時間不隨頁數增加
+# ==========================================
+def bench_ranking_pages(args):
+    use_temp_db()
+    DBManager.init_db()
+    conn = models.db_connections.get()
+    print(f"[ranking-pages] seeding {args.rows:,} scores")
+    seed_scores(conn, args.rows)
+    for mode_filter in (None, "填空"):
+        after, timings = None, []
+        for page_no in range(args.pages):
+            start = time.perf_counter()
+            page = DBManager.get_score_page(mode_filter, after)
+            elapsed = (time.perf_counter() - start) * 1000
+            if not page:  # 成績不夠 --pages 頁 (或這個模式的成績較少)，翻到最後一頁就停
+                break
+            timings.append(elapsed)
+            last = page[-1]
+            after = (last["percent"], last["score"], last["id"])
+        if not timings:
+            print(f"  {mode_filter or models.ALL_MODES}: no scores")
+            continue
+        pages = len(timings)
+        # 對照：以 OFFSET 跳到同樣深度
+        where = "WHERE mode=? " if mode_filter else ""
+        params = (mode_filter,) if mode_filter else ()
+        start = time.perf_counter()
+        conn.execute(f"SELECT id, username, mode, score, total, percent, time FROM scores {where}"
+                     "ORDER BY percent DESC, score DESC, id LIMIT ? OFFSET ?",
+                     params + (models.RANKING_PAGE_SIZE,
+                               (pages - 1) * models.RANKING_PAGE_SIZE)).fetchall()
+        offset_ms = (time.perf_counter() - start) * 1000
+        print(f"  {mode_filter or models.ALL_MODES}: first page {timings[0]:.3f} ms   "
+              f"page {pages} {timings[-1]:.3f} ms   mean {sum(timings) / len(timings):.3f} ms   "
+              f"(OFFSET to page {pages}: {offset_ms:.3f} ms)")
+
+
+# ==========================================
+# leaderboard-cache：上課情境，每輪大家各存一次成績，之間反覆開排行榜
+# ==========================================
+def bench_leaderboard_cache(args):
+    use_temp_db()
+    DBManager.init_db()
+    seed_scores(models.db_connections.get(), args.rows)
+    rnd = random.Random(5)
+    students = [f"student{i}" for i in range(args.students)]
+    views = [(mode, limit) for mode in [None] + MODES for limit in (20, models.RANKING_PAGE_SIZE)]
+
+    def run(use_cache):
+        DBManager.top_scores_cache = models.TopScoresCache()
+        elapsed = 0.0
+        for _ in range(args.rounds):
+            for name in students:
+                UserSession().login(name)
+                DBManager.save_score(rnd.choice(MODES), rnd.randint(0, 5), 5)
+            for _ in range(args.students * args.opens):
+                mode, limit = rnd.choice(views)
+                start = time.perf_counter()
+                if not use_cache:
+                    DBManager.top_scores_cache.clear()
+                DBManager.get_top_scores(mode, limit)
+                elapsed += time.perf_counter() - start
+        calls = args.rounds * args.students * args.opens
+        return elapsed / calls * 1000, DBManager.top_scores_cache.stats()
+
+    uncached, _ = run(False)
+    cached, stats = run(True)
+    print(f"[leaderboard-cache] {args.students} students x {args.rounds} rounds, "
+          f"{args.opens} ranking opens per student per round")
+    print(f"  no cache {uncached:.4f} ms/open   cache {cached:.4f} ms/open   "
+          f"hit rate {stats['hit_rate']:.1%}  (hits {stats['hits']}, misses {stats['misses']}, "
+          f"invalidated {stats['invalidations']})")
+
+
+# ==========================================
+# ranking-views：個人最佳 / 平均 / 次數與今日 / 本週排行 (v10 升級與查詢時間)
+# ==========================================
+def bench_ranking_views(args):
+    use_temp_db()
+    conn = models.db_connections.get()
+    # 先建到 v9 (還沒有 ts 與 user_stats)，灌資料後再量升級時間
+    for migrate in models.SCHEMA_MIGRATIONS[:9]:
+        migrate(conn)
+    conn.execute("PRAGMA user_version=9")
+    conn.commit()
+    print(f"[ranking-views] seeding {args.rows:,} scores for {args.users} users")
+    seed_scores(conn, args.rows, users=args.users)
+
+    start = time.perf_counter()
+    DBManager.init_db()
+    print(f"  upgrade to v{DBManager.schema_version()} (ts backfill + user_stats) "
+          f"took {time.perf_counter() - start:.1f}s")
+
+    # seed_scores 的日期落在 2026 年內，把「現在」設在最後一天，今日 / 本週才是小範圍
+    now = datetime(2026, 12, 27, 18, 0)
+    for view in models.RANKING_VIEWS:
+        for period in models.RANKING_PERIODS:
+            if view == "scores" and period is None:
+                continue  # 全部時間的單次成績見 ranking-pages
+            for mode_filter in (None, "填空"):
+                per_call = time_per_call(
+                    lambda: DBManager.get_ranking(view, period, mode_filter, now=now), args.repeat)
+                print(f"  {models.RANKING_VIEWS[view]:<6} {models.RANKING_PERIODS[period]:<6} "
+                      f"{mode_filter or models.ALL_MODES:<4} {per_call:8.3f} ms")
+
+    UserSession().login("bench")
+    per_call = time_per_call(lambda: DBManager.save_score("填空", 4, 5), args.repeat)
+    print(f"  save_score with leaderboard + user_stats triggers: {per_call:.3f} ms")
+
+
+# ==========================================
+# sessions：不開視窗，直接用 QuizSession / MatchSession 跑大量模擬測驗
+# ==========================================
+def simulate_session(session, rnd, accuracy):
+    """模擬一位學生作答一整回合，回傳作答次數"""
+    answers = 0
+    if isinstance(session, models.MatchSession):
+        ids = list(session.pair_by_id)
+        for left_id in ids:
+            while left_id not in session.matched_left:
+                right_id = left_id if rnd.random() < accuracy else rnd.choice(ids)
+                session.match(left_id, right_id)
+                answers += 1
+    else:
+        while session.current() is not None:
+            question = session.current()
+            session.answer(question["en"] if rnd.random() < accuracy else "???")
+            answers += 1
+            session.next()
+    session.finish()
+    return answers
+
+
+def bench_sessions(args):
+    use_temp_db()
+    DBManager.init_db()
+    rnd = random.Random(11)
+    kinds = {
+        "填空": lambda user, save: models.QuizSession(models.FillQuizStrategy(), "填空", 5,
+                                                    username=user, save=save),
+        "選擇題": lambda user, save: models.QuizSession(models.ChoiceQuizStrategy(), "選擇題", 5,
+                                                     username=user, save=save),
+        "連連看": lambda user, save: models.MatchSession(num_questions=5, username=user, save=save),
+    }
+    print(f"[sessions] {args.sessions} sessions per mode, {args.students} simulated students")
+    # save=False 只量出題與對答案；save=True 另外包含存成績、複習進度與作答紀錄
+    for save in (False, True):
+        for mode, make in kinds.items():
+            answers = 0
+            start = time.perf_counter()
+            for i in range(args.sessions):
+                answers += simulate_session(make(f"student{i % args.students}", save), rnd, args.accuracy)
+            elapsed = time.perf_counter() - start
+            print(f"  {mode:<4} save={save!s:<5} {args.sessions / elapsed:9,.0f} sessions/sec   "
+                  f"{answers / elapsed:9,.0f} answers/sec")
+    models.answer_log.flush()
+    conn = models.db_connections.get()
+    saved = conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    events = conn.execute("SELECT COUNT(*) FROM answer_events").fetchone()[0]
+    print(f"  saved scores: {saved:,}   answer events: {events:,}")
+
+
+# ==========================================
+# load：整班學生同時登入、存檔、看排行榜 (多執行緒 / 多行程)
+# ==========================================
+LOAD_PASSWORD = "pw"
+# 每位學生登入 (註冊一次) 後，依這個比例隨機做事
+LOAD_MIX = {"verify_user": 2, "save_score": 3, "get_top_scores": 3}
+
+
+def load_ops(impl):
+    """回傳 {操作名稱: 函式(使用者, 亂數)}；impl = pooled (目前的 DBManager) 或 legacy (每次連線)"""
+    pwd_hash = models.hashlib.sha256(LOAD_PASSWORD.encode()).hexdigest()
+    modes = MODES + [None]
+    if impl == "legacy":
+        return {
+            "register_user": lambda user, rnd: LegacyDBManager.register_user(user, pwd_hash),
+            "verify_user": lambda user, rnd: LegacyDBManager.verify_user(user, pwd_hash),
+            "save_score": lambda user, rnd: LegacyDBManager.save_score(
+                user, rnd.choice(MODES), rnd.randint(0, 5), 5),
+            "get_top_scores": lambda user, rnd: LegacyDBManager.get_top_scores(rnd.choice(modes)),
+        }
+
+    def register(user, rnd):
+        ok, msg = DBManager.register_user(user, LOAD_PASSWORD)
+        if not ok and msg != "帳號已存在":
+            raise sqlite3.OperationalError(msg)  # register_user 把錯誤轉成訊息，這裡還原成例外
+
+    return {
+        "register_user": register,
+        "verify_user": lambda user, rnd: DBManager.verify_user(user, LOAD_PASSWORD),
+        "save_score": lambda user, rnd: DBManager.save_score(
+            rnd.choice(MODES), rnd.randint(0, 5), 5, username=user),
+        "get_top_scores": lambda user, rnd: DBManager.get_top_scores(rnd.choice(modes)),
+    }
+
+
+def run_load_client(impl, client_id, ops_per_client, seed, barrier, out):
+    """一位學生：等所有人就位後同時開始；每個操作的延遲與錯誤記在 out"""
+    rnd = random.Random(seed * 100_003 + client_id)  # 每位學生的操作順序固定，可重現
+    user = f"load{client_id}"
+    ops = load_ops(impl)
+    plan = ["register_user"] + rnd.choices(list(LOAD_MIX), list(LOAD_MIX.values()), k=ops_per_client)
+    barrier.wait()
+    out["start"] = min(out.get("start", float("inf")), time.time())
+    for name in plan:
+        start = time.perf_counter()
+        try:
+            ops[name](user, rnd)
+        except sqlite3.OperationalError as e:
+            key = "locked" if "locked" in str(e) or "busy" in str(e) else "other"
+            out["errors"][name][key] += 1
+        except Exception:
+            out["errors"][name]["other"] += 1
+        else:
+            out["latency"][name].append((time.perf_counter() - start) * 1000)
+    out["end"] = max(out.get("end", 0.0), time.time())
+
+
+def new_load_result():
+    ops = ["register_user"] + list(LOAD_MIX)
+    return {"latency": {op: [] for op in ops},
+            "errors": {op: {"locked": 0, "other": 0} for op in ops}}
+
+
+def load_worker(db_path, impl, client_ids, ops_per_client, seed, barrier, queue=None):
+    """一個行程：每位學生一條執行緒；結果合併成一份 (多行程時放進 queue)"""
+    models.DB_NAME = db_path
+    results = []
+    threads = []
+    for client_id in client_ids:
+        out = new_load_result()
+        results.append(out)
+        threads.append(threading.Thread(target=run_load_client,
+                                        args=(impl, client_id, ops_per_client, seed, barrier, out)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    merged = new_load_result()
+    for out in results:
+        for op, values in out["latency"].items():
+            merged["latency"][op] += values
+        for op, counts in out["errors"].items():
+            for key, n in counts.items():
+                merged["errors"][op][key] += n
+    merged["start"] = min(out["start"] for out in results)
+    merged["end"] = max(out["end"] for out in results)
+    if queue is not None:
+        queue.put(merged)
+    return merged
+
+
+def percentile(sorted_values, p):
+    """nearest-rank 百分位數"""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, min(len(sorted_values), round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def run_load(impl, clients, processes, args):
+    """建立全新的資料庫跑一輪，回傳統計摘要"""
+    db_path = use_temp_db()
+    DBManager.init_db()
+    conn = models.db_connections.get()
+    seed_scores(conn, args.rows, seed=args.seed)
+    if impl == "legacy":
+        # 舊版程式沒有開 WAL，用預設的 rollback journal 才是當初的情況
+        conn.execute("PRAGMA journal_mode=DELETE")
+    models.db_connections.close_all()
+
+    client_ids = list(range(clients))
+    if processes <= 0:
+        results = [load_worker(db_path, impl, client_ids, args.ops, args.seed,
+                               threading.Barrier(clients))]
+    else:
+        # spawn：子行程重新匯入 models，不會繼承父行程的 SQLite 連線與背景執行緒
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(clients)
+        queue = ctx.Queue()
+        workers = [ctx.Process(target=load_worker,
+                               args=(db_path, impl, client_ids[i::processes], args.ops, args.seed,
+                                     barrier, queue))
+                   for i in range(processes)]
+        for w in workers:
+            w.start()
+        results = [queue.get() for _ in workers]
+        for w in workers:
+            w.join()
+    models.db_connections.close_all()
+
+    elapsed = max(r["end"] for r in results) - min(r["start"] for r in results)
+    summary = {"impl": impl, "clients": clients, "processes": processes, "ops_per_client": args.ops,
+               "seed": args.seed, "elapsed_s": elapsed, "ops": {}}
+    total_ok = 0
+    for op in results[0]["latency"]:
+        values = sorted(v for r in results for v in r["latency"][op])
+        locked = sum(r["errors"][op]["locked"] for r in results)
+        other = sum(r["errors"][op]["other"] for r in results)
+        total_ok += len(values)
+        summary["ops"][op] = {"ok": len(values), "locked": locked, "other_errors": other,
+                              "p50_ms": percentile(values, 50), "p95_ms": percentile(values, 95),
+                              "p99_ms": percentile(values, 99)}
+    summary["throughput"] = total_ok / elapsed if elapsed > 0 else float("inf")
+    return summary
+
+
+def bench_load(args):
+    summaries = []
+    for impl in args.impl:
+        for clients in args.clients:
+            for processes in args.processes:
+                s = run_load(impl, clients, processes, args)
+                summaries.append(s)
+                workers = f"{processes} processes" if processes > 0 else "threads"
+                print(f"[load] impl={impl} clients={clients} ({workers}) ops/client={args.ops} "
+                      f"seed={args.seed}: {s['throughput']:,.0f} ops/sec in {s['elapsed_s']:.2f}s")
+                for op, o in s["ops"].items():
+                    print(f"  {op:<15} ok {o['ok']:>6}  p50 {o['p50_ms']:8.2f}  p95 {o['p95_ms']:8.2f}  "
+                          f"p99 {o['p99_ms']:8.2f} ms   locked {o['locked']:>4}  other {o['other_errors']:>4}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+        print(f"  results written to {args.json}")
+    locked = sum(o["locked"] for s in summaries for o in s["ops"].values())
+    return 1 if args.fail_on_locked and locked else 0
+
+
+# ==========================================
+# sync：多台電腦透過 score_server.py 共用排行榜 (全部在本機 localhost 模擬)
+# ==========================================
+def start_score_server(db_path, port=0):
+    """另開一個程式執行 score_server.py，回傳 (process, port)"""
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "score_server.py"),
+                             "--port", str(port), "--db", db_path],
+                            stdout=subprocess.PIPE, text=True, encoding="utf-8")
+    line = proc.stdout.readline()  # 伺服器準備好才會印出這行
+    return proc, int(line.split("http://", 1)[1].split()[0].rsplit(":", 1)[1])
+
+
+def stop_score_server(proc):
+    proc.terminate()
+    proc.wait(timeout=10)
+    proc.stdout.close()
+
+
+def sync_machine(address, machine_id, scores, seed, queue):
+    """一台模擬的電腦：自己的本機資料庫，存 scores 筆成績後關閉 (會把剩下的上傳完)"""
+    use_temp_db(f"machine{machine_id}.db")
+    DBManager.init_db()
+    sync = DBManager.connect_server(address)
+    rnd = random.Random(seed * 100_003 + machine_id)
+    latencies = []
+    for i in range(scores):
+        start = time.perf_counter()
+        DBManager.save_score(rnd.choice(MODES), rnd.randint(0, 5), 5, username=f"m{machine_id}u{i % 30}")
+        latencies.append((time.perf_counter() - start) * 1000)
+    DBManager.disconnect_server()
+    queue.put({"machine": machine_id, "uploaded": sync.uploaded, "pending": sync.pending(),
+               "save_p50_ms": percentile(sorted(latencies), 50),
+               "save_p99_ms": percentile(sorted(latencies), 99)})
+
+
+def server_score_count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def wait_until(condition, timeout=20.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def bench_sync(args):
+    server_db = os.path.join(tempfile.mkdtemp(prefix="quiz_bench_"), "server.db")
+    proc, port = start_score_server(server_db)
+    address = f"127.0.0.1:{port}"
+    print(f"[sync] server on {address}, {args.machines} machines x {args.scores} scores")
+    try:
+        # 1) 多台電腦同時存檔、背景批次上傳
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        start = time.perf_counter()
+        machines = [ctx.Process(target=sync_machine, args=(address, i, args.scores, args.seed, queue))
+                    for i in range(args.machines)]
+        for m in machines:
+            m.start()
+        results = sorted((queue.get() for _ in machines), key=lambda r: r["machine"])
+        for m in machines:
+            m.join()
+        elapsed = time.perf_counter() - start
+        expected = args.machines * args.scores
+        count = server_score_count(server_db)
+        for r in results:
+            print(f"  machine {r['machine']}: uploaded {r['uploaded']}, left {r['pending']}, "
+                  f"save_score p50 {r['save_p50_ms']:.2f} ms  p99 {r['save_p99_ms']:.2f} ms")
+        print(f"  server has {count}/{expected} scores after {elapsed:.2f}s "
+              f"({count / elapsed:,.0f} scores/sec uploaded)")
+
+        # 2) 排行榜查詢：keep-alive 連線 vs 每次新連線 vs 本機
+        use_temp_db("client.db")
+        DBManager.init_db()
+        sync = DBManager.connect_server(address)
+        for mode in MODES + [None]:
+            DBManager.get_top_scores(mode)
+        report_ms = lambda name, ms: print(f"  {name:<34} {ms:8.3f} ms/call")
+        report_ms("get_top_scores (keep-alive)",
+                  time_per_call(lambda: DBManager.get_top_scores(random.choice(MODES)), args.reads))
+
+        def new_connection():
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/top?limit=20")
+            conn.getresponse().read()
+            conn.close()
+        report_ms("get_top_scores (new connection)", time_per_call(new_connection, args.reads))
+        DBManager.sync = None
+        report_ms("get_top_scores (local db)",
+                  time_per_call(lambda: DBManager.get_top_scores(random.choice(MODES)), args.reads))
+        DBManager.sync = sync
+
+        # 3) 離線：伺服器停掉時照常存檔、排行榜退回本機；伺服器回來後補傳
+        stop_score_server(proc)
+        before = server_score_count(server_db)
+        start = time.perf_counter()
+        for i in range(args.offline):
+            DBManager.save_score(MODES[i % len(MODES)], i % 6, 5, username=f"offline{i % 10}")
+        offline_ms = (time.perf_counter() - start) * 1000 / args.offline
+        rows = DBManager.get_top_scores()
+        print(f"  offline: saved {args.offline} scores ({offline_ms:.2f} ms/save), "
+              f"pending {sync.pending()}, leaderboard from local db: {len(rows)} rows, online={sync.online}")
+        proc, port = start_score_server(server_db, port)
+        sync.notify()
+        flushed = wait_until(lambda: sync.pending() == 0, timeout=sync.interval * 3)
+        after = server_score_count(server_db)
+        print(f"  back online: flushed={flushed}, server +{after - before} scores (expected {args.offline})")
+
+        # 4) 重送同一批 (例如回應在路上遺失)：伺服器依 (origin, id) 去除重複
+        conn = models.db_connections.get()
+        with conn:
+            conn.execute("DELETE FROM sync_state WHERE key='uploaded_id'")
+        resent = sync.upload_pending()
+        print(f"  resent {resent} scores, server total {server_score_count(server_db)} (unchanged: "
+              f"{server_score_count(server_db) == after})")
+        DBManager.disconnect_server()
+    finally:
+        stop_score_server(proc)
+    return 0 if count == expected and flushed else 1
+
+
+# ==========================================
+# login：不同密碼雜湊 cost 下，一整班同時登入的吞吐量
+# ==========================================
+def timed_logins(users, password, threads):
+    """每個帳號登入一次；回傳 logins/sec (threads > 1 時同時登入)"""
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            ok = all(pool.map(lambda u: DBManager.verify_user(u, password), users))
+    else:
+        ok = all(DBManager.verify_user(u, password) for u in users)
+    elapsed = time.perf_counter() - start
+    if not ok:
+        raise RuntimeError("login failed")
+    return len(users) / elapsed
+
+
+def bench_login(args):
+    password = "correct horse"
+    print(f"[login] {args.users} students, {args.threads} threads; logins/sec "
+          f"(a class of {args.users} logging in at once takes users / rate seconds)")
+    print(f"  {'cost':>9} {'register/s':>11} {'1 thread':>10} {f'{args.threads} threads':>11} "
+          f"{'cached':>10} {'class login':>12}")
+    saved_cost = models.PASSWORD_COST
+    try:
+        for cost in args.costs:
+            use_temp_db()
+            DBManager.init_db()
+            DBManager.password_cache.clear()
+            models.PASSWORD_COST = cost
+            users = [f"s{i:03d}" for i in range(args.users)]
+            start = time.perf_counter()
+            for u in users:
+                DBManager.register_user(u, password)
+            register_rate = len(users) / (time.perf_counter() - start)
+            DBManager.password_cache.clear()
+            single = timed_logins(users, password, 1)
+            DBManager.password_cache.clear()
+            parallel = timed_logins(users, password, args.threads)
+            cached = timed_logins(users, password, 1)  # 上一輪都登入成功過，這輪全走快取
+            print(f"  {cost:>9,} {register_rate:>11,.1f} {single:>10,.1f} {parallel:>11,.1f} "
+                  f"{cached:>10,.0f} {len(users) / parallel:>11.2f}s")
+
+        # 舊的 sha256 帳號：第一次登入順便升級成目前的 cost，之後走新雜湊
+        models.PASSWORD_COST = args.costs[-1]
+        use_temp_db()
+        DBManager.init_db()
+        DBManager.password_cache.clear()
+        conn = models.db_connections.get()
+        with conn:
+            conn.executemany("INSERT INTO users (username, password) VALUES (?, ?)",
+                             [(u, models.legacy_hash_password(password)) for u in users])
+        upgrade = timed_logins(users, password, args.threads)
+        upgraded = conn.execute("SELECT COUNT(*) FROM users WHERE salt IS NOT NULL AND cost=?",
+                                (models.PASSWORD_COST,)).fetchone()[0]
+        print(f"  legacy sha256 -> cost {models.PASSWORD_COST:,}: first login {upgrade:,.1f} logins/sec "
+              f"({args.threads} threads), upgraded {upgraded}/{len(users)} accounts")
+    finally:
+        models.PASSWORD_COST = saved_cost
+        DBManager.password_cache.clear()
+    return 0
+
+
+# ==========================================
+# transfer：批次開帳號、成績串流匯出 / 匯入
+# ==========================================
+def bench_transfer(args):
+    print(f"[transfer] users: {args.users} accounts at cost {args.cost:,}")
+    use_temp_db()
+    DBManager.init_db()
+    users = [(f"s{i:05d}", f"pw{i}") for i in range(args.users)]
+    one_by_one = users[:args.single]
+    start = time.perf_counter()
+    for user, pwd in one_by_one:
+        DBManager.register_user(user, pwd)
+    report("register_user one by one", len(one_by_one), time.perf_counter() - start)
+    start = time.perf_counter()
+    added, skipped = DBManager.import_users(users, cost=args.cost)
+    report(f"import_users (+{added}, skip {skipped})", len(users), time.perf_counter() - start)
+
+    folder = os.path.dirname(models.DB_NAME)
+    for rows in args.rows:
+        use_temp_db()
+        DBManager.init_db()
+        seed_scores(models.db_connections.get(), rows, seed=args.seed)
+        print(f"[transfer] {rows:,} scores, chunk {args.chunk}")
+        for ext in ("csv", "jsonl"):
+            path = os.path.join(folder, f"scores_{rows}.{ext}")
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = DBManager.export_scores(path, args.chunk)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            report(f"export {ext} (peak {peak / 1e6:.1f} MB)", count, elapsed)
+
+            use_temp_db()
+            DBManager.init_db()
+            tracemalloc.start()
+            start = time.perf_counter()
+            count, _ = DBManager.import_scores(path, args.chunk)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            report(f"import {ext} (peak {peak / 1e6:.1f} MB)", count, elapsed)
+            print(f"    file {os.path.getsize(path) / 1e6:.1f} MB; leaderboard top: "
+                  f"{DBManager.get_top_scores(limit=1)[0]['percent']:.0f}%, "
+                  f"users ranked: {len(DBManager.get_ranking('attempts', limit=10_000))}")
+            os.remove(path)
+    return 0
+
+
+# ==========================================
+# analytics：分組統計 (每人 / 每模式 / 每天) 的速度與記憶體
+# ==========================================
+def naive_score_stats(groupings, percentiles):
+    """對照組：像 get_top_scores 一樣把每列轉成字典、全部放進記憶體再分組"""
+    conn = models.db_connections.get()
+    rows = [{"username": r[0], "mode": r[1], "day": r[2], "percent": r[3]} for r in conn.execute(
+        "SELECT username, mode, substr(time, 1, 10), percent FROM scores")]
+    result = {}
+    for g in groupings:
+        groups = {}
+        for r in rows:
+            groups.setdefault(tuple(r[d] for d in g), []).append(r["percent"])
+        stats = []
+        for key, values in groups.items():
+            values.sort()
+            stats.append({"key": key, "count": len(values), "mean": sum(values) / len(values),
+                          **{f"p{p:g}": percentile(values, p) for p in percentiles}})
+        result["+".join(g)] = stats
+    return result
+
+
+def traced(func):
+    """回傳 (結果, 秒數, 尖峰記憶體 MB)；NumPy 陣列也會被 tracemalloc 記到"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_analytics(args):
+    import analytics
+
+    groupings = [tuple(g.split(",")) for g in args.by]
+    percentiles = (25, 50, 75, 90)
+    use_temp_db()
+    DBManager.init_db()
+    conn = models.db_connections.get()
+    with conn:
+        # 統計只讀 scores 本身：灌資料時先拿掉維護排行榜的 trigger，ts 最後一次補上
+        models._suspend_score_triggers(conn)
+    start = time.perf_counter()
+    seed_scores(conn, args.rows, users=args.users, seed=args.seed)
+    with conn:
+        conn.execute("UPDATE scores SET ts = CAST(strftime('%s', time, 'utc') AS INTEGER)")
+    print(f"[analytics] {args.rows:,} scores, {args.users} users (seeded in {time.perf_counter() - start:.1f}s); "
+          f"groupings: {', '.join('+'.join(g) for g in groupings)}")
+
+    paths = ([True] if analytics.np is not None else []) + [False]
+    for vectorized in paths:
+        name = "numpy" if vectorized else "pure python"
+        run = lambda: analytics.score_stats(groupings, percentiles, chunk_size=args.chunk,
+                                            use_numpy=vectorized)
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        peak = traced(run)[2]
+        groups = ", ".join(f"{k} {len(v):,}" for k, v in result.items())
+        report(f"score_stats {name} (peak {peak:.0f} MB)", args.rows, elapsed)
+        print(f"    groups: {groups}")
+    if analytics.np is None:
+        print("  (NumPy not installed: vectorized path skipped)")
+
+    since = datetime.now().timestamp() - 30 * 86400
+    start = time.perf_counter()
+    recent = analytics.score_stats([("mode",)], percentiles, since=since, chunk_size=args.chunk)
+    n = sum(r["count"] for r in recent["mode"])
+    print(f"  last 30 days by mode (ts index): {n:,} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    if args.rows <= args.baseline_max:
+        _, elapsed, peak = traced(lambda: naive_score_stats(groupings, percentiles))
+        report(f"row-by-row dicts (peak {peak:.0f} MB)", args.rows, elapsed)
+        print("    (timed under tracemalloc; slower than untraced)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="英文單字學習系統效能測試")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("connections", help="比較連線池與每次重新連線的 ops/sec")
+    p.add_argument("--ops", type=int, default=2000)
+    p.set_defaults(func=bench_connections)
+
+    p = sub.add_parser("indexes", help="舊資料庫升級後的排行榜查詢速度與查詢計畫")
+    p.add_argument("--rows", type=int, default=2_000_000)
+    p.add_argument("--repeat", type=int, default=20)
+    p.set_defaults(func=bench_indexes)
+
+    p = sub.add_parser("startup", help="啟動匯入時間與第一個視窗出現的時間")
+    p.add_argument("--top", type=int, default=15)
+    p.add_argument("--max-import-ms", type=float, default=0,
+                   help="匯入時間超過此值就回傳非 0（0 = 不檢查）")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("distractors", help="選擇題干擾選項抽樣速度")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    p.add_argument("--questions", type=int, default=1000)
+    p.set_defaults(func=bench_distractors)
+
+    p = sub.add_parser("distractor-index", help="相似干擾選項索引的建立與出題時間")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    p.add_argument("--quizzes", type=int, default=200)
+    p.set_defaults(func=bench_distractor_index)
+
+    p = sub.add_parser("sampling", help="抽題速度：整個題庫 copy+shuffle vs. O(k) 抽樣")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    p.add_argument("--repeat", type=int, default=200)
+    p.set_defaults(func=bench_sampling)
+
+    p = sub.add_parser("reviews", help="大量複習紀錄下取得到期單字的速度")
+    p.add_argument("--rows", type=int, default=2_000_000)
+    p.add_argument("--users", type=int, default=200)
+    p.add_argument("--repeat", type=int, default=500)
+    p.set_defaults(func=bench_reviews)
+
+    p = sub.add_parser("match-board", help="連連看大題數：QListWidget vs. model/view 的載入時間與記憶體")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    p.add_argument("--clicks", type=int, default=20)
+    p.set_defaults(func=bench_match_board)
+
+    p = sub.add_parser("ranking-pages", help="排行榜分頁：keyset vs. OFFSET")
+    p.add_argument("--rows", type=int, default=2_000_000)
+    p.add_argument("--pages", type=int, default=500)
+    p.set_defaults(func=bench_ranking_pages)
+
+    p = sub.add_parser("leaderboard-cache", help="排行榜查詢快取的命中率與速度")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--students", type=int, default=40)
+    p.add_argument("--rounds", type=int, default=10)
+    p.add_argument("--opens", type=int, default=3)
+    p.set_defaults(func=bench_leaderboard_cache)
+
+    p = sub.add_parser("ranking-views", help="排行榜統計 (個人最佳 / 平均 / 次數、今日 / 本週) 的查詢速度")
+    p.add_argument("--rows", type=int, default=2_000_000)
+    p.add_argument("--users", type=int, default=5000)
+    p.add_argument("--repeat", type=int, default=20)
+    p.set_defaults(func=bench_ranking_views)
+
+    p = sub.add_parser("sessions", help="不開視窗模擬大量測驗回合 (QuizSession)")
+    p.add_argument("--sessions", type=int, default=5000)
+    p.add_argument("--students", type=int, default=200)
+    p.add_argument("--accuracy", type=float, default=0.7)
+    p.set_defaults(func=bench_sessions)
+
+    p = sub.add_parser("analytics", help="成績分組統計 (串流 + NumPy / 純 Python) 與逐列字典的比較")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--users", type=int, default=500)
+    p.add_argument("--by", nargs="+", default=["username", "mode", "day", "username,day"])
+    p.add_argument("--chunk", type=int, default=200_000)
+    p.add_argument("--baseline-max", type=int, default=1_000_000,
+                   help="筆數不超過這個數字時才跑逐列字典的對照組 (很吃記憶體)")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_analytics)
+
+    p = sub.add_parser("transfer", help="批次開帳號與成績串流匯出 / 匯入的速度與記憶體")
+    p.add_argument("--users", type=int, default=2000)
+    p.add_argument("--single", type=int, default=50, help="對照組：逐一 register_user 的帳號數")
+    p.add_argument("--cost", type=int, default=10_000, help="import_users 的初始密碼 cost")
+    p.add_argument("--rows", type=int, nargs="+", default=[50_000, 200_000])
+    p.add_argument("--chunk", type=int, default=models.TRANSFER_CHUNK)
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_transfer)
+
+    p = sub.add_parser("login", help="不同密碼雜湊 cost 下的登入吞吐量 (含快取與舊帳號升級)")
+    p.add_argument("--costs", type=int, nargs="+", default=[10_000, 100_000, 200_000, 600_000],
+                   help="PBKDF2 迭代次數")
+    p.add_argument("--users", type=int, default=40)
+    p.add_argument("--threads", type=int, default=8)
+    p.set_defaults(func=bench_login)
+
+    p = sub.add_parser("sync", help="多台電腦透過成績同步伺服器共用排行榜 (上傳、查詢、離線補傳)")
+    p.add_argument("--machines", type=int, default=4)
+    p.add_argument("--scores", type=int, default=500, help="每台電腦存幾筆成績")
+    p.add_argument("--reads", type=int, default=500)
+    p.add_argument("--offline", type=int, default=200, help="伺服器停掉時存幾筆成績")
+    p.add_argument("--seed", type=int, default=42)
+    p.set_defaults(func=bench_sync)
+
+    p = sub.add_parser("load", help="模擬整班同時登入 / 存檔 / 看排行榜的延遲與鎖定錯誤")
+    p.add_argument("--clients", type=int, nargs="+", default=[60, 200])
+    p.add_argument("--processes", type=int, nargs="+", default=[0, 4],
+                   help="0 = 所有學生都是同一個行程內的執行緒；N = 平均分到 N 個行程")
+    p.add_argument("--impl", nargs="+", choices=["pooled", "legacy"], default=["pooled", "legacy"])
+    p.add_argument("--ops", type=int, default=20, help="每位學生登入後的操作數")
+    p.add_argument("--rows", type=int, default=100_000, help="事先灌入的成績筆數")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", help="把結果另存成 JSON，方便之後比較")
+    p.add_argument("--fail-on-locked", action="store_true", help="出現 database is locked 就回傳非 0")
+    p.set_defaults(func=bench_load)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
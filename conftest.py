@@ -0,0 +1,21 @@
+# conftest.py
+# pytest 共用的 fixture：每個測試使用 tmp_path 裡的一個新資料庫，不會動到 quiz_system.db。
+import pytest
+
+import models
+from models import DBManager
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """建立空的資料庫 (已跑完所有 migration)，回傳目前執行緒的連線"""
+    monkeypatch.setattr(models, "DB_NAME", str(tmp_path / "quiz.db"))
+    DBManager.init_db()
+    DBManager.top_scores_cache.clear()
+    DBManager.password_cache.clear()
+    models.ai_cache.clear_memory()
+    yield models.db_connections.get()
+    DBManager.top_scores_cache.clear()
+    DBManager.password_cache.clear()
+    models.ai_cache.clear_memory()
+    models.db_connections.release()
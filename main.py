@@ -2,10 +2,10 @@ import sys
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QLabel, QDialog
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 
 # 引用資料庫與使用者 Session 管理
-from models import DBManager, UserSession
+from models import DBManager, UserSession, SpacedRepetitionStrategy, warm_ai_backend, SCORE_SERVER, vocabulary
 
 # 引用所有視窗介面 (包含連連看 MatchQuizWindow)
 from windows_quiz import (
@@ -13,15 +13,20 @@ from windows_quiz import (
     FillQuizWindow, 
     ChoiceQuizWindow, 
     MatchQuizWindow, 
+    LargeMatchQuizWindow,
     RankingDialog
 )
 
+# 連連看大挑戰最多的配對數；題庫不夠大時就用題庫的單字數
+LARGE_MATCH_PAIRS = 200
+
+
 class MenuWindow(QWidget):
     """主選單視窗"""
     def __init__(self):
         super().__init__()
         self.setWindowTitle("英文單字學習系統 - 主選單")
-        self.setFixedSize(450, 500)
+        self.setFixedSize(450, 620)
         
         # 1. 取得目前登入的使用者名稱
         user_name = UserSession().get_user()
@@ -38,11 +43,15 @@ class MenuWindow(QWidget):
         self.btn_fill = QPushButton("填空模式（中文 → 英文）")
         self.btn_choice = QPushButton("選擇題模式（四選一）")
         self.btn_match = QPushButton("連連看模式（配對遊戲）") 
+        self.large_match_pairs = min(LARGE_MATCH_PAIRS, vocabulary.count())
+        self.btn_match_large = QPushButton(f"連連看大挑戰（{self.large_match_pairs} 組）")
+        self.btn_review = QPushButton("複習模式（到期單字優先）")
         self.btn_rank = QPushButton("查看排行榜")
         self.btn_exit = QPushButton("登出 / 離開")
         
         # 設定按鈕樣式與高度
-        for btn in [self.btn_fill, self.btn_choice, self.btn_match, self.btn_rank, self.btn_exit]:
+        for btn in [self.btn_fill, self.btn_choice, self.btn_match, self.btn_match_large,
+                    self.btn_review, self.btn_rank, self.btn_exit]:
             btn.setMinimumHeight(45)
             btn.setStyleSheet("font-size: 20px;")
             
@@ -57,6 +66,8 @@ class MenuWindow(QWidget):
         layout.addWidget(self.btn_fill)
         layout.addWidget(self.btn_choice)
         layout.addWidget(self.btn_match)
+        layout.addWidget(self.btn_match_large)
+        layout.addWidget(self.btn_review)
         layout.addWidget(self.btn_rank)
         layout.addStretch() # 把按鈕往上頂，離開按鈕在最下
         layout.addWidget(self.btn_exit)
@@ -70,6 +81,8 @@ class MenuWindow(QWidget):
         self.btn_fill.clicked.connect(self.open_fill_mode)
         self.btn_choice.clicked.connect(self.open_choice_mode)
         self.btn_match.clicked.connect(self.open_match_mode)
+        self.btn_match_large.clicked.connect(self.open_large_match_mode)
+        self.btn_review.clicked.connect(self.open_review_mode)
         self.btn_rank.clicked.connect(self.open_ranking)
         self.btn_exit.clicked.connect(self.close)
 
@@ -85,6 +98,16 @@ class MenuWindow(QWidget):
         self.current_window = MatchQuizWindow(num_questions=5)
         self.current_window.show()
 
+    def open_large_match_mode(self):
+        self.current_window = LargeMatchQuizWindow(num_questions=self.large_match_pairs)
+        self.current_window.show()
+
+    def open_review_mode(self):
+        # 間隔複習沿用填空畫面，只是換成 SpacedRepetitionStrategy 出題
+        self.current_window = FillQuizWindow(num_questions=5,
+                                             strategy=SpacedRepetitionStrategy(), mode="複習")
+        self.current_window.show()
+
     def open_ranking(self):
         self.current_window = RankingDialog(self)
         self.current_window.exec_()
@@ -96,11 +119,17 @@ if __name__ == "__main__":
     # 步驟 1: 初始化資料庫 (若檔案不存在會自動建立)
     # 這符合專題報告加分項目：整合 SQLite
     DBManager.init_db()
+    # 有設定 QUIZ_SCORE_SERVER 時，成績上傳到共用伺服器，排行榜顯示所有電腦的成績
+    if SCORE_SERVER:
+        DBManager.connect_server(SCORE_SERVER)
     
     # 步驟 2: 顯示登入視窗
     # 必須先登入成功才能進入主選單
     login_window = LoginDialog()
     
+    # 登入視窗出現後，才在背景載入 AI 套件，不拖慢啟動時間
+    QTimer.singleShot(0, warm_ai_backend)
+    
     if login_window.exec_() == QDialog.Accepted:
         # 登入成功 (LoginDialog 內部驗證通過後會回傳 Accepted)
         menu_window = MenuWindow()
@@ -0,0 +1,131 @@
+# score_server.py
+# 成績同步伺服器：一台電腦持有共用的資料庫，其他電腦的 main.py 設定
+# QUIZ_SCORE_SERVER=<位址>:<埠> 後，成績會上傳到這裡，排行榜也從這裡讀。
+#
+#   python score_server.py --host 0.0.0.0 --port 8765 --db shared.db
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import models
+from models import DBManager, RANKING_PAGE_SIZE
+
+DEFAULT_PORT = 8765
+
+
+# ==========================================
+# HTTP 介面
+# ==========================================
+class ScoreRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /ping                                  → {"ok": true}
+    GET  /top?mode=&limit=                      → DBManager.get_top_scores
+    GET  /page?mode=&limit=&after_percent=&after_score=&after_id=  → DBManager.get_score_page
+    GET  /ranking?view=&period=&mode=&limit=&offset=              → DBManager.get_ranking
+    GET  /modes                                 → DBManager.get_modes
+    POST /scores  {"origin": ..., "scores": [[id, username, mode, score, total, time], ...]}
+                                                → {"added": 新增筆數}
+    每個連線由一條執行緒處理，資料庫連線沿用 models.db_connections (每個執行緒一條，連線結束時釋放)。
+    伺服器必須是獨立的程式：同一個行程若又 connect_server()，DBManager 會把查詢轉回伺服器自己。
+    """
+    # HTTP/1.1：同一條 TCP 連線可以連續送多個請求 (keep-alive)
+    protocol_version = "HTTP/1.1"
+    # 標頭與內容分開寫出；不關掉 Nagle 的話，keep-alive 連線上每個回應會卡住約 40ms (delayed ACK)
+    disable_nagle_algorithm = True
+    quiet = True
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, route):
+        try:
+            self._send_json(route())
+        except (KeyError, ValueError, TypeError) as e:
+            self._send_json({"error": f"參數錯誤：{e}"}, 400)
+        except Exception as e:
+            self._send_json({"error": str(e)}, 500)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        routes = {
+            "/ping": lambda: {"ok": True},
+            "/top": lambda: DBManager.get_top_scores(query.get("mode"), int(query.get("limit", 20))),
+            "/page": lambda: DBManager.get_score_page(
+                query.get("mode"), self._after(query), int(query.get("limit", RANKING_PAGE_SIZE))),
+            "/ranking": lambda: DBManager.get_ranking(
+                query.get("view", "best"), query.get("period"), query.get("mode"),
+                int(query.get("limit", RANKING_PAGE_SIZE)), int(query.get("offset", 0))),
+            "/modes": DBManager.get_modes,
+        }
+        route = routes.get(parts.path)
+        if route is None:
+            self._send_json({"error": "not found"}, 404)
+        else:
+            self._handle(route)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if urlsplit(self.path).path != "/scores":
+            self._send_json({"error": "not found"}, 404)
+            return
+
+        def upload():
+            data = json.loads(body)
+            return {"added": DBManager.save_synced_scores(str(data["origin"]), data["scores"])}
+        self._handle(upload)
+
+    def finish(self):
+        # ThreadingHTTPServer 每個連線開一條新執行緒，連線結束時關掉這條執行緒的資料庫連線
+        try:
+            super().finish()
+        finally:
+            models.db_connections.release()
+
+    @staticmethod
+    def _after(query):
+        if "after_id" not in query:
+            return None
+        return float(query["after_percent"]), int(query["after_score"]), int(query["after_id"])
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+# ==========================================
+# 命令列：python score_server.py
+# ==========================================
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="英文單字學習系統 - 成績同步伺服器")
+    parser.add_argument("--host", default="127.0.0.1", help="要讓其他電腦連線請用 0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=models.DB_NAME, help="共用的資料庫檔案")
+    parser.add_argument("--verbose", action="store_true", help="印出每個請求")
+    args = parser.parse_args(argv)
+
+    models.DB_NAME = args.db
+    DBManager.init_db()
+    ScoreRequestHandler.quiet = not args.verbose
+    server = ThreadingHTTPServer((args.host, args.port), ScoreRequestHandler)
+    server.daemon_threads = True
+    # --port 0 會自動挑一個空的埠；印出實際的埠，flush 讓啟動它的程式 (benchmark.py) 讀得到
+    print(f"成績同步伺服器：http://{args.host}:{server.server_port}  資料庫：{args.db}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
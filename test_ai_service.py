@@ -0,0 +1,108 @@
+# test_ai_service.py
+# AIExplanationService：以假的 fetch 取代 AI 模型，檢查請求合併、取消與過時結果的處理。
+#
+#   QT_QPA_PLATFORM=offscreen python -m pytest -q test_ai_service.py
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from windows_quiz import AIExplanationService  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+class StubFetch:
+    """假的 AI：記錄呼叫次數，release(word) 之前不會回傳，測試可以控制結果送回的順序"""
+    def __init__(self):
+        self.calls = []
+        self._gates = {}
+        self._lock = threading.Lock()
+
+    def _gate(self, word):
+        with self._lock:
+            return self._gates.setdefault(word, threading.Event())
+
+    def __call__(self, word):
+        with self._lock:
+            self.calls.append(word)
+        self._gate(word).wait(5)
+        return f"解說：{word}"
+
+    def release(self, word):
+        self._gate(word).set()
+
+
+class Owner:
+    """代替視窗：收到的結果依序記下來"""
+    def __init__(self):
+        self.received = []
+
+    def on_ready(self, word, text):
+        self.received.append((word, text))
+
+
+def wait_until(app, condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.005)
+    app.processEvents()
+    return condition()
+
+
+@pytest.fixture
+def service(app):
+    fetch = StubFetch()
+    pool = QtCore.QThreadPool()
+    pool.setMaxThreadCount(4)  # 假的 fetch 會卡住執行緒，單核心機器上也要能同時查兩個字
+    svc = AIExplanationService(fetch=fetch, pool=pool)
+    yield svc, fetch
+    for word in list(fetch._gates) + list(svc._waiting):
+        fetch.release(word)
+    pool.waitForDone(5000)
+
+
+def test_duplicate_requests_make_one_call(app, service):
+    svc, fetch = service
+    first, second = Owner(), Owner()
+    assert svc.request(first, "apple", first.on_ready) is True
+    assert svc.request(second, "apple", second.on_ready) is False
+    assert svc.request(first, "apple", first.on_ready) is False
+    fetch.release("apple")
+    assert wait_until(app, lambda: svc.pending() == 0)
+    assert fetch.calls == ["apple"]
+    assert first.received == [("apple", "解說：apple")]
+    assert second.received == [("apple", "解說：apple")]
+
+
+def test_cancelled_request_never_emits(app, service):
+    svc, fetch = service
+    closed, other = Owner(), Owner()
+    svc.request(closed, "banana", closed.on_ready)
+    svc.request(other, "banana", other.on_ready)
+    svc.cancel(closed)
+    fetch.release("banana")
+    assert wait_until(app, lambda: svc.pending() == 0)
+    assert closed.received == []
+    assert other.received == [("banana", "解說：banana")]
+
+
+def test_stale_result_for_previous_word_is_dropped(app, service):
+    svc, fetch = service
+    owner = Owner()
+    svc.request(owner, "cat", owner.on_ready)
+    svc.request(owner, "dog", owner.on_ready)
+    fetch.release("dog")
+    assert wait_until(app, lambda: owner.received)
+    fetch.release("cat")  # 舊的字比較晚查回來
+    assert wait_until(app, lambda: svc.pending() == 0)
+    assert owner.received == [("dog", "解說：dog")]
+    assert sorted(fetch.calls) == ["cat", "dog"]
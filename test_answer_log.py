@@ -0,0 +1,33 @@
+# test_answer_log.py
+# AnswerEventLog：資料庫一直寫入失敗時，背景執行緒以遞增的間隔重試，不會空轉；恢復後事件照樣寫入。
+import sqlite3
+import time
+
+from models import AnswerEventLog
+
+
+def test_write_failures_back_off(temp_db, monkeypatch):
+    log = AnswerEventLog(batch_size=1, interval=0.05, max_backoff=0.2)
+    real_write = log._write
+    attempts = []
+
+    def locked(batch):
+        attempts.append(time.monotonic())
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(log, "_write", locked)
+    for i in range(5):  # 緩衝一直超過 batch_size
+        log.log("alice", f"word{i}", "填空", True, 1200)
+    time.sleep(0.8)
+
+    # 退避 0.05, 0.1, 0.2, 0.2… 秒：0.8 秒內只會重試少數幾次
+    assert 3 <= len(attempts) <= 8
+    gaps = [b - a for a, b in zip(attempts, attempts[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+    assert log.failures == len(attempts) and isinstance(log.last_error, sqlite3.OperationalError)
+    assert log.pending() == 5
+
+    monkeypatch.setattr(log, "_write", real_write)
+    log.close()
+    assert log.pending() == 0
+    assert temp_db.execute("SELECT COUNT(*) FROM answer_events").fetchone()[0] == 5
@@ -0,0 +1,52 @@
+# test_distractors.py
+# 選擇題干擾選項：相似候選 (逐字計算 / NumPy 整批計算) 都不會出現同字或同義的選項，
+# 索引依題庫版本快取，題庫換版時取代舊的索引。
+import random
+
+import pytest
+
+import models
+from models import DistractorIndex, sample_distractors, get_distractor_index
+
+
+def make_bank(size):
+    rnd = random.Random(3)
+    bank = [{"en": "".join(rnd.choice("abcdefgh") for _ in range(5)) + str(i), "zh": f"詞{i}",
+             "unit": i % 6} for i in range(size)]
+    for i in range(0, size - 1, 10):  # 每 10 個字就有一組同義字
+        bank[i + 1]["zh"] = bank[i]["zh"]
+    return bank
+
+
+@pytest.mark.parametrize("eager_limit", [10 ** 6, 0])
+def test_neighbors_exclude_same_word_and_synonym(eager_limit):
+    if eager_limit == 0:
+        pytest.importorskip("numpy")
+    bank = make_bank(3000)
+    index = DistractorIndex(bank, eager_limit=eager_limit, seed=1)
+    for i in range(0, len(bank), 7):
+        near = index.neighbors(i)
+        assert near and len(set(near)) == len(near)
+        assert all(bank[j]["en"] != bank[i]["en"] and bank[j]["zh"] != bank[i]["zh"] for j in near)
+        options = index.pick(i, 3)
+        assert len(options) == 3 and bank[i]["en"] not in options
+
+
+def test_sample_distractors_fallback_skips_synonyms():
+    bank = [{"en": "big", "zh": "大的"}, {"en": "large", "zh": "大的"}, {"en": "huge", "zh": "大的"},
+            {"en": "cat", "zh": "貓"}, {"en": "dog", "zh": "狗"}]
+    for _ in range(50):
+        picked = sample_distractors(bank, "big", 3, zh="大的")
+        assert sorted(picked) == ["cat", "dog"]
+
+
+def test_index_cache_replaced_per_version(monkeypatch):
+    monkeypatch.setattr(models, "_distractor_indexes", {})
+    bank = make_bank(50)
+    first = get_distractor_index(bank, "vocabulary", 1)
+    assert get_distractor_index(bank, "vocabulary", 1) is first
+    second = get_distractor_index(bank, "vocabulary", 2)
+    assert second is not first
+    get_distractor_index(make_bank(40))
+    get_distractor_index(make_bank(30))
+    assert set(models._distractor_indexes) == {"vocabulary", "list"}
@@ -0,0 +1,71 @@
+# test_pregen.py
+# pregenerate_explanations 以 StubBackend 離線執行：寫入快取、第二次跳過、中斷後接著跑。
+import pytest
+
+import models
+from models import (
+    StubBackend, ExplanationCache, ai_cache, build_ai_prompt,
+    pregenerate_explanations, get_ai_explanation, get_ai_backend, set_ai_backend,
+)
+
+WORDS = [f"word{i}" for i in range(10)]
+
+
+class CountingStub(StubBackend):
+    """記錄 explain 被呼叫的單字；fail 裡的單字丟出例外 (模擬中途斷線)"""
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def explain(self, word):
+        self.calls.append(word)
+        if word in self.fail:
+            raise ConnectionError("模擬斷線")
+        return super().explain(word)
+
+
+def pinned(backend, words=WORDS):
+    hashes = {w: ExplanationCache.make_key(w, backend.name, build_ai_prompt(w))[2] for w in words}
+    return ai_cache.pinned_words(backend.name, hashes)
+
+
+@pytest.fixture
+def stub_backend(temp_db):
+    previous = get_ai_backend()
+    backend = CountingStub()
+    set_ai_backend(backend)
+    yield backend
+    set_ai_backend(previous)
+
+
+def test_pregen_fills_cache_and_second_run_skips(stub_backend):
+    result = pregenerate_explanations(WORDS, backend=stub_backend, rate=0)
+    assert result == {"done": len(WORDS), "skipped": 0, "failed": {}}
+    assert pinned(stub_backend) == set(WORDS)
+
+    stub_backend.calls.clear()
+    again = pregenerate_explanations(WORDS, backend=stub_backend, rate=0)
+    assert again == {"done": 0, "skipped": len(WORDS), "failed": {}}
+    assert stub_backend.calls == []
+
+    # 預先產生的解說直接由快取回應，不必再呼叫後端
+    ai_cache.clear_memory()
+    assert get_ai_explanation("word3") == StubBackend().explain("word3")
+    assert stub_backend.calls == []
+
+
+def test_interrupted_pregen_resumes(stub_backend):
+    flaky = CountingStub(fail={"word2", "word5"})
+    first = pregenerate_explanations(WORDS[:6], backend=flaky, concurrency=2, rate=0)
+    assert first["done"] == 4 and set(first["failed"]) == {"word2", "word5"}
+    assert pinned(flaky) == {"word0", "word1", "word3", "word4"}
+
+    second = pregenerate_explanations(WORDS, backend=stub_backend, rate=0)
+    assert second == {"done": 6, "skipped": 4, "failed": {}}
+    assert sorted(stub_backend.calls) == sorted(set(WORDS) - {"word0", "word1", "word3", "word4"})
+    assert pinned(stub_backend) == set(WORDS)
+
+
+def test_pregen_rejects_uncached_backend(temp_db):
+    with pytest.raises(ValueError):
+        pregenerate_explanations(WORDS, backend=models.LocalDictionaryBackend(), rate=0)
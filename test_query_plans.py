@@ -0,0 +1,65 @@
+# test_query_plans.py
+# 排行榜查詢的執行計畫：直接 EXPLAIN DBManager 上的 SQL 常數 (與 get_top_scores 執行的是同一個字串)，
+# 確認在小型的測試資料庫上也走索引、不需要額外排序。
+#
+#   python -m pytest -q
+import random
+
+import pytest
+
+import models
+from models import DBManager, ALL_MODES
+
+MODES = ["填空", "選擇題", "連連看", "複習"]
+
+
+@pytest.fixture
+def seeded_db(temp_db):
+    rng = random.Random(42)
+    rows = []
+    for i in range(2000):
+        total = rng.randint(5, 20)
+        score = rng.randint(0, total)
+        rows.append((f"user{i % 50}", rng.choice(MODES), score, total,
+                     round(score / total * 100, 2), f"2026-10-{1 + i % 28:02d} 12:00:00"))
+    with temp_db:
+        temp_db.executemany("INSERT INTO scores (username, mode, score, total, percent, time) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        temp_db.execute("ANALYZE")
+    DBManager.top_scores_cache.clear()
+    return temp_db
+
+
+def query_plan(conn, sql, params):
+    return [r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+@pytest.mark.parametrize("sql, params", [
+    (DBManager.TOP_SCORES_LEADERBOARD_SQL, ("填空", 20)),
+    (DBManager.TOP_SCORES_LEADERBOARD_SQL, (ALL_MODES, 20)),
+    (DBManager.TOP_SCORES_MODE_SQL, ("填空", 200)),
+    (DBManager.TOP_SCORES_ALL_SQL, (200,)),
+])
+def test_top_scores_sql_uses_index(seeded_db, sql, params):
+    plan = query_plan(seeded_db, sql, params)
+    text = " | ".join(plan)
+    assert any("USING" in step and "INDEX" in step for step in plan), f"沒有使用索引：{text}"
+    assert not any("TEMP B-TREE" in step for step in plan), f"仍需要額外排序：{text}"
+    assert not any(step.startswith("SCAN scores") and "INDEX" not in step for step in plan), text
+
+
+def test_top_scores_sql_matches_sorted_scores(seeded_db):
+    """超過 leaderboard 筆數時走 scores 的查詢，結果與直接排序整張表相同"""
+    limit = models.LEADERBOARD_SIZE + 50
+    expected = sorted(seeded_db.execute("SELECT percent, score FROM scores WHERE mode=?", ("填空",)),
+                      reverse=True)[:limit]
+    got = DBManager.get_top_scores("填空", limit)
+    assert [(r["percent"], r["score"]) for r in got] == expected
+    # 同分的名次與 leaderboard 相同 (都依 id)，排行榜翻過 LEADERBOARD_SIZE 筆時順序不會跳動
+    assert got[:models.LEADERBOARD_SIZE] == DBManager.get_top_scores("填空", models.LEADERBOARD_SIZE)
+
+
+def test_redundant_rank_indexes_dropped(seeded_db):
+    names = {r[0] for r in seeded_db.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert "idx_scores_mode_rank" not in names and "idx_scores_rank" not in names
+    assert {"idx_scores_mode_page", "idx_scores_page"} <= names
@@ -0,0 +1,70 @@
+# test_score_server.py
+# 成績同步伺服器：上傳的成績有任何一列不合理就整批回應 400、不寫入；用戶端不會上傳這種成績。
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from models import DBManager, ScoreSyncClient
+from score_server import ScoreRequestHandler
+
+
+@pytest.fixture
+def server(temp_db):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ScoreRequestHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post_scores(server, rows, origin="pc1"):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    try:
+        conn.request("POST", "/scores", json.dumps({"origin": origin, "scores": rows}),
+                     {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def count_scores(conn):
+    return conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+
+def test_upload_valid_scores(server, temp_db):
+    rows = [[1, "alice", "填空", 4, 5, "2026-10-01 09:00:00"], [2, "bob", "填空", 5, 5, "2026-10-01 09:01:00"]]
+    assert post_scores(server, rows) == (200, {"added": 2})
+    assert post_scores(server, rows) == (200, {"added": 0})  # 重送不會重複計分
+    assert count_scores(temp_db) == 2
+
+
+@pytest.mark.parametrize("bad", [[3, "eve", "填空", 9, 5, "2026-10-01 09:02:00"],
+                                 [3, "eve", "填空", -2, 5, "2026-10-01 09:02:00"],
+                                 [3, "eve", "填空", 0, 0, "2026-10-01 09:02:00"],
+                                 [3, "eve", "填空", "5", 5, "2026-10-01 09:02:00"]])
+def test_upload_rejects_bad_rows(server, temp_db, bad):
+    rows = [[1, "alice", "填空", 4, 5, "2026-10-01 09:00:00"], bad]
+    status, body = post_scores(server, rows)
+    assert status == 400 and "error" in body
+    assert count_scores(temp_db) == 0  # 整批都不寫入
+    with pytest.raises(ValueError):
+        DBManager.save_synced_scores("pc1", rows)
+
+
+def test_client_skips_rows_server_would_reject(server, temp_db):
+    with temp_db:
+        temp_db.executemany("INSERT INTO scores (username, mode, score, total, percent, time) "
+                            "VALUES (?, '填空', ?, ?, 0, '2026-10-01 09:00:00')",
+                            [("alice", 4, 5), ("bob", 0, 0), ("carol", 5, 5)])
+    client = ScoreSyncClient(f"127.0.0.1:{server.server_port}")
+    try:
+        assert client.upload_pending() == 2
+        assert client.upload_pending() == 0
+    finally:
+        client.close()
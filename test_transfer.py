@@ -0,0 +1,56 @@
+# test_transfer.py
+# 成績匯出 / 匯入：CSV 與 JSONL 來回一次內容不變；不合理的列 (分數超出範圍、total 為 0、欄位缺漏) 會被略過並計數。
+import json
+
+import pytest
+
+import models
+from models import DBManager, check_score
+
+ROWS = [("alice", "填空", 4, 5, "2026-10-01 09:00:00"),
+        ("bob", "選擇題", 0, 10, "2026-10-02 10:30:00"),
+        ("alice", "連連看", 8, 8, "2026-10-03 11:45:00")]
+
+
+def scores(conn):
+    return conn.execute("SELECT username, mode, score, total, percent, time FROM scores ORDER BY id").fetchall()
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl"])
+def test_round_trip_skips_bad_rows(temp_db, tmp_path, suffix):
+    for user, mode, score, total, time in ROWS:
+        temp_db.execute("INSERT INTO scores (username, mode, score, total, percent, time) VALUES (?, ?, ?, ?, ?, ?)",
+                        (user, mode, score, total, score / total * 100, time))
+    temp_db.commit()
+    before = scores(temp_db)
+    path = str(tmp_path / f"scores{suffix}")
+    assert DBManager.export_scores(path) == len(ROWS)
+
+    # 在匯出檔後面加上幾列壞資料
+    bad = [{"username": "eve", "mode": "填空", "score": 7, "total": 5, "time": "2026-10-04 08:00:00"},
+           {"username": "eve", "mode": "填空", "score": -1, "total": 5, "time": "2026-10-04 08:00:00"},
+           {"username": "eve", "mode": "填空", "score": 0, "total": 0, "time": "2026-10-04 08:00:00"},
+           {"username": "eve", "mode": "填空", "score": "x", "total": 5, "time": "2026-10-04 08:00:00"},
+           {"username": "eve", "mode": "填空", "score": 3, "total": 5, "time": "昨天"},
+           {"username": "", "mode": "填空", "score": 3, "total": 5, "time": "2026-10-04 08:00:00"}]
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        for r in bad:
+            if suffix == ".jsonl":
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            else:
+                f.write(f"0,{r['username']},{r['mode']},{r['score']},{r['total']},0,{r['time']}\r\n")
+
+    models.DB_NAME = str(tmp_path / "imported.db")
+    models.db_connections.release()
+    DBManager.init_db()
+    conn = models.db_connections.get()
+    assert DBManager.import_scores(path) == (len(ROWS), len(bad))
+    assert scores(conn) == before
+    assert conn.execute("SELECT MAX(percent) FROM scores").fetchone()[0] <= 100
+    assert [r["name"] for r in DBManager.get_top_scores(limit=3)] == ["alice", "alice", "bob"]
+
+
+@pytest.mark.parametrize("score, total", [(6, 5), (-1, 5), (0, 0), (3, -5), (2.5, 5), ("3", 5), (True, 5)])
+def test_check_score_rejects(score, total):
+    with pytest.raises(ValueError):
+        check_score(score, total)
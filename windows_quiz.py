@@ -1,47 +1,139 @@
 # windows_quiz.py
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtGui import QPixmap, QBrush
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QLineEdit, QPushButton,
     QVBoxLayout, QHBoxLayout, QMessageBox, QDialog,
-    QTableWidget, QTableWidgetItem, QComboBox,
-    QListWidget, QListWidgetItem, QInputDialog, QFormLayout
+    QTableView, QComboBox,
+    QListWidget, QListWidgetItem, QListView, QInputDialog, QFormLayout
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import (
+    Qt, QObject, QRunnable, QThreadPool, pyqtSignal,
+    QAbstractListModel, QAbstractTableModel, QModelIndex,
+)
+from array import array
 import random
 
 from models import (
-    normalize, WORDS,
-    DBManager, UserSession, get_ai_explanation,
+    normalize, vocabulary,
+    DBManager, UserSession, get_ai_explanation, answer_log, db_connections,
+    ALL_MODES, RANKING_PAGE_SIZE, RANKING_VIEWS, RANKING_PERIODS,
     FillQuizStrategy, ChoiceQuizStrategy, MatchQuizStrategy,
+    QuizSession, MatchSession,
 )
 
 
+# ========= AI 解說背景查詢 (不卡住畫面) =========
+class _AIJobSignals(QObject):
+    # 由背景執行緒 emit，Qt 會自動排入 GUI 執行緒的事件迴圈再處理
+    done = pyqtSignal(str, str)
+
+
+class _AIJob(QRunnable):
+    def __init__(self, word, fetch, signals):
+        super().__init__()
+        self.word = word
+        self.fetch = fetch
+        self.signals = signals
+
+    def run(self):
+        try:
+            text = self.fetch(self.word)
+        except Exception as e:
+            text = f"（AI 解說失敗：{e}）"
+        finally:
+            # 執行緒池的執行緒會留著重用，做完就把這條執行緒的資料庫連線還掉
+            db_connections.release()
+        self.signals.done.emit(self.word, text)
+
+
+class AIExplanationService(QObject):
+    """
+    在 QThreadPool 背景查詢 AI 解說，結果透過 signal 送回 GUI 執行緒。
+    - 同一個單字還在查詢中時，不會重複送出請求，只是多登記一個等待者
+    - 視窗關閉時呼叫 cancel(視窗)，之後查回來的結果就不會再送給它
+    - 同一個視窗一次只等一個單字：改查別的字之後，前一個字查回來的結果不會再送給它
+    fetch 可替換成假的模型函式，不需要網路就能測試。
+    """
+    _instance = None
+    explanation_ready = pyqtSignal(str, str)
+
+    def __init__(self, fetch=None, pool=None):
+        super().__init__()
+        self.fetch = fetch or get_ai_explanation
+        self.pool = pool or QThreadPool.globalInstance()
+        self._waiting = {}  # word -> [(owner, callback), ...]
+        self._signals = _AIJobSignals()
+        self._signals.done.connect(self._on_done)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def request(self, owner, word, callback):
+        """送出查詢；回傳 False 代表已合併到進行中的同一個請求"""
+        for other, others in self._waiting.items():
+            if other != word:
+                others[:] = [(o, cb) for o, cb in others if o is not owner]
+        waiters = self._waiting.get(word)
+        if waiters is not None:
+            if not any(o is owner for o, _ in waiters):
+                waiters.append((owner, callback))
+            return False
+        self._waiting[word] = [(owner, callback)]
+        self.pool.start(_AIJob(word, self.fetch, self._signals))
+        return True
+
+    def cancel(self, owner):
+        """取消某個視窗所有等待中的請求（網路請求本身無法中斷，只是丟棄結果）"""
+        for waiters in self._waiting.values():
+            waiters[:] = [(o, cb) for o, cb in waiters if o is not owner]
+
+    def pending(self):
+        return len(self._waiting)
+
+    def _on_done(self, word, text):
+        for _, callback in self._waiting.pop(word, []):
+            callback(word, text)
+        self.explanation_ready.emit(word, text)
+
+
+# ========= 背景工作 (登入的密碼雜湊、成績伺服器的查詢不卡住畫面) =========
+class _BackgroundJobSignals(QObject):
+    done = pyqtSignal(object)
+
+
+class _BackgroundJob(QRunnable):
+    """在 QThreadPool 執行 func(*args)，結果 (或例外) 由 signals.done 送回 GUI 執行緒"""
+    def __init__(self, func, args, signals):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            result = e
+        finally:
+            db_connections.release()
+        self.signals.done.emit(result)
+
+
 # ========= 連連看模式 (新增 AI 與 資料庫支援) =========
 class MatchQuizWindow(QWidget):
-    def __init__(self, num_questions=5):
+    def __init__(self, num_questions=5, mode="連連看"):
         super().__init__()
-        self.num_questions = min(num_questions, len(WORDS))
-        self.score = 0
-        self.pairs = []
         self.left_selected = None
         self.right_selected = None
-        self.matched_count = 0
 
-        # 使用策略模式取得配對資料
-        self.strategy = MatchQuizStrategy()
-        self.init_data()
+        # 使用策略模式取得配對資料；配對、計分與存檔都交給 MatchSession，
+        # 列表項目只存配對 id，同字異義 (同英文不同中文) 也不會認錯
+        self.session = MatchSession(MatchQuizStrategy(), mode, min(num_questions, vocabulary.count()))
         self.init_ui()
 
-    def init_data(self):
-        # 這裡改成用策略的 generate_questions()
-        raw_pairs = self.strategy.generate_questions(self.num_questions)
-        self.pairs = raw_pairs  # [{"zh": ..., "en": ...}, ...]
-        self.matched_count = 0
-        self.score = 0
-        self.left_selected = None
-        self.right_selected = None
-
-
     def init_ui(self):
         self.setWindowTitle(f"連連看模式 - 玩家: {UserSession().get_user()}")
         self.setFixedSize(1000, 650)
@@ -50,13 +142,7 @@ class MatchQuizWindow(QWidget):
         label_instruction.setAlignment(Qt.AlignCenter)
 
         # 左右列表
-        self.list_left = QListWidget()
-        self.list_right = QListWidget()
-        self.list_left.setSelectionMode(QListWidget.SingleSelection)
-        self.list_right.setSelectionMode(QListWidget.SingleSelection)
-
-        self.list_left.itemClicked.connect(self.on_left_clicked)
-        self.list_right.itemClicked.connect(self.on_right_clicked)
+        self.create_lists()
 
         self.label_status = QLabel("請開始配對")
         self.label_status.setAlignment(Qt.AlignCenter)
@@ -87,24 +173,31 @@ class MatchQuizWindow(QWidget):
         self.setLayout(main_layout)
         self.load_lists()
 
+    def create_lists(self):
+        self.list_left = QListWidget()
+        self.list_right = QListWidget()
+        self.list_left.setSelectionMode(QListWidget.SingleSelection)
+        self.list_right.setSelectionMode(QListWidget.SingleSelection)
+
+        self.list_left.itemClicked.connect(self.on_left_clicked)
+        self.list_right.itemClicked.connect(self.on_right_clicked)
+
     def load_lists(self):
         self.list_left.clear()
         self.list_right.clear()
         
-        # 左邊放中文 (隱藏英文 data)
-        for w in self.pairs:
+        # 左邊放中文、右邊放英文 (打亂)；兩邊的 data 都是配對 id
+        pair_by_id = self.session.pair_by_id
+        for pair_id, w in pair_by_id.items():
             item = QListWidgetItem(w["zh"])
-            item.setData(Qt.UserRole, w["en"])
+            item.setData(Qt.UserRole, pair_id)
             self.list_left.addItem(item)
 
-        # 右邊放英文 (打亂)
-        en_list = [w["en"] for w in self.pairs]
-        random.shuffle(en_list)
-        for en in en_list:
-            item = QListWidgetItem(en)
-            # 反查中文當 data
-            zh = next(w["zh"] for w in self.pairs if w["en"] == en)
-            item.setData(Qt.UserRole, zh)
+        right_ids = list(pair_by_id)
+        random.shuffle(right_ids)
+        for pair_id in right_ids:
+            item = QListWidgetItem(pair_by_id[pair_id]["en"])
+            item.setData(Qt.UserRole, pair_id)
             self.list_right.addItem(item)
 
     def on_left_clicked(self, item):
@@ -119,22 +212,12 @@ class MatchQuizWindow(QWidget):
         if not self.left_selected or not self.right_selected:
             return
 
-        zh_text = self.left_selected.text()
-        en_text = self.right_selected.text()
-
-        # 檢查是否匹配
-        is_correct = any((w["zh"] == zh_text and w["en"] == en_text) for w in self.pairs)
-
-        if is_correct:
-            self.matched_count += 1
-            self.score += 1
-            self.label_status.setText(f"配對成功！目前進度：{self.matched_count}/{self.num_questions}")
+        # 檢查是否匹配：同一個配對 id，或題目中有完全相同的 (中文, 英文) 配對
+        session = self.session
+        if session.match(self.left_selected.data(Qt.UserRole), self.right_selected.data(Qt.UserRole)):
+            self.label_status.setText(f"配對成功！目前進度：{session.matched_count}/{session.num_questions}")
             
-            # 鎖定已配對項目
-            for item in [self.left_selected, self.right_selected]:
-                item.setFlags(Qt.NoItemFlags) # 禁止再選
-                item.setForeground(Qt.gray)   # 變灰色
-                item.setSelected(False)       # 取消選取狀態
+            self.lock_matched(self.left_selected, self.right_selected)
         else:
             self.label_status.setText("配對錯誤，請再試一次")
             # 取消選取讓使用者重選
@@ -144,40 +227,144 @@ class MatchQuizWindow(QWidget):
         self.left_selected = None
         self.right_selected = None
 
-        if self.matched_count >= self.num_questions:
+        if session.finished:
             self.show_final_result()
 
+    def lock_matched(self, left, right):
+        # 鎖定已配對項目
+        for item in [left, right]:
+            item.setFlags(Qt.NoItemFlags) # 禁止再選
+            item.setForeground(Qt.gray)   # 變灰色
+            item.setSelected(False)       # 取消選取狀態
+
+    def selected_pair_id(self):
+        """目前選取項目的配對 id：優先看右邊 (英文)，其次看左邊 (中文)"""
+        for lst in [self.list_right, self.list_left]:
+            if lst.currentItem() and lst.currentItem().isSelected():
+                return lst.currentItem().data(Qt.UserRole)
+        return None
+
     def show_ai_help(self):
         """解釋目前選取的單字 (左邊或右邊)"""
-        target_word = None
-        
-        # 優先看右邊選了哪個英文
-        if self.list_right.currentItem() and self.list_right.currentItem().isSelected():
-            target_word = self.list_right.currentItem().text()
-        # 其次看左邊選了哪個中文 (取出隱藏的英文 data)
-        elif self.list_left.currentItem() and self.list_left.currentItem().isSelected():
-            target_word = self.list_left.currentItem().data(Qt.UserRole)
+        pair_id = self.selected_pair_id()
+        target_word = self.session.pair_by_id[pair_id]["en"] if pair_id is not None else None
             
         if target_word:
             self.label_status.setText("AI 正在查詢中...")
-            self.repaint()
-            explanation = get_ai_explanation(target_word)
-            QMessageBox.information(self, "AI 解說", explanation)
-            self.label_status.setText("")
+            AIExplanationService.instance().request(self, target_word, self.on_ai_ready)
         else:
             QMessageBox.warning(self, "提示", "請先點選一個單字，再按 AI 解說")
 
+    def on_ai_ready(self, word, explanation):
+        if self.label_status.text() == "AI 正在查詢中...":
+            self.label_status.setText("")
+        QMessageBox.information(self, "AI 解說", explanation)
+
+    def closeEvent(self, event):
+        AIExplanationService.instance().cancel(self)
+        self.session.close()        # 沒做完就關閉時，也要寫入已作答單字的複習進度
+        answer_log.request_flush()  # 視窗關閉時請背景執行緒把作答紀錄寫入
+        super().closeEvent(event)
+
     def show_final_result(self):
-        # 改用 DBManager 存檔
-        DBManager.save_score("連連看", self.score, self.num_questions)
+        score, total = self.session.finish()  # 由 MatchSession 存檔
         QMessageBox.information(self, "完成", 
-            f"恭喜！完成所有配對。\n得分：{self.score}/{self.num_questions}")
+            f"恭喜！完成所有配對。\n得分：{score}/{total}")
         self.close()
 
     def restart_match(self):
-        self.init_data()
+        self.session.restart()
+        self.left_selected = None
+        self.right_selected = None
         self.load_lists()
 
+
+# ========= 連連看大挑戰 (數百組配對，使用 model / view) =========
+class MatchListModel(QAbstractListModel):
+    """
+    大量配對用的清單 model：文字放在 list、配對 id 放在 array、
+    是否已配對放在 bytearray (每項 1 byte)，不為每一列建立 QListWidgetItem。
+    QListView 只會向 model 要畫面上看得到的那幾列，所以重繪成本不隨題數增加。
+    """
+    _GRAY = None
+
+    def __init__(self, texts, ids, parent=None):
+        super().__init__(parent)
+        self.texts = texts
+        self.ids = array("i", ids)
+        self.matched = bytearray(len(texts))
+        self.row_of = array("i", bytes(4 * len(texts)))  # 配對 id -> 列
+        for row, pair_id in enumerate(self.ids):
+            self.row_of[pair_id] = row
+        if MatchListModel._GRAY is None:
+            MatchListModel._GRAY = QBrush(Qt.gray)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.texts)
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self.texts[row]
+        if role == Qt.UserRole:
+            return self.ids[row]
+        if role == Qt.ForegroundRole and self.matched[row]:
+            return self._GRAY
+        return None
+
+    def flags(self, index):
+        if self.matched[index.row()]:
+            return Qt.NoItemFlags  # 已配對：禁止再選
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def set_matched(self, pair_id):
+        row = self.row_of[pair_id]
+        self.matched[row] = 1
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+
+class LargeMatchQuizWindow(MatchQuizWindow):
+    """連連看大挑戰：與 MatchQuizWindow 同樣的規則，改用 QListView + MatchListModel"""
+    def __init__(self, num_questions=200):
+        super().__init__(num_questions, mode="連連看大挑戰")  # 分數與一般連連看分開排名
+        self.setWindowTitle(f"連連看大挑戰 ({self.session.num_questions} 組) - 玩家: {UserSession().get_user()}")
+
+    def create_lists(self):
+        self.list_left = QListView()
+        self.list_right = QListView()
+        for view in [self.list_left, self.list_right]:
+            view.setSelectionMode(QListView.SingleSelection)
+            view.setUniformItemSizes(True)       # 不必逐列量測高度
+            view.setLayoutMode(QListView.Batched)
+            view.setBatchSize(100)
+
+        self.list_left.clicked.connect(self.on_left_clicked)
+        self.list_right.clicked.connect(self.on_right_clicked)
+
+    def load_lists(self):
+        pair_by_id = self.session.pair_by_id
+        ids = list(pair_by_id)
+        self.left_model = MatchListModel([pair_by_id[i]["zh"] for i in ids], ids, self)
+        random.shuffle(ids)
+        self.right_model = MatchListModel([pair_by_id[i]["en"] for i in ids], ids, self)
+        self.list_left.setModel(self.left_model)
+        self.list_right.setModel(self.right_model)
+
+    def lock_matched(self, left, right):
+        # left / right 是 QModelIndex，data(UserRole) 同樣是配對 id
+        self.left_model.set_matched(left.data(Qt.UserRole))
+        self.right_model.set_matched(right.data(Qt.UserRole))
+        self.list_left.clearSelection()
+        self.list_right.clearSelection()
+
+    def selected_pair_id(self):
+        for view in [self.list_right, self.list_left]:
+            index = view.currentIndex()
+            if index.isValid() and view.selectionModel().isSelected(index):
+                return index.data(Qt.UserRole)
+        return None
+
 # ========= 登入視窗 (頂部顯示圖片) =========
 class LoginDialog(QDialog):
     def __init__(self):
@@ -220,45 +407,59 @@ class LoginDialog(QDialog):
         self.btn_login.clicked.connect(self.handle_login)
         self.btn_register.clicked.connect(self.handle_register)
 
+    def run_in_background(self, func, args, callback):
+        """密碼雜湊在 QThreadPool 執行；期間按鈕停用，結果回到 GUI 執行緒再交給 callback"""
+        self.btn_login.setEnabled(False)
+        self.btn_register.setEnabled(False)
+        self._auth_signals = _BackgroundJobSignals()
+
+        def finished(result):
+            self.btn_login.setEnabled(True)
+            self.btn_register.setEnabled(True)
+            if isinstance(result, Exception):
+                QMessageBox.warning(self, "錯誤", str(result))
+            else:
+                callback(result)
+        self._auth_signals.done.connect(finished)
+        QThreadPool.globalInstance().start(_BackgroundJob(func, args, self._auth_signals))
+
     def handle_login(self):
         user = self.edit_user.text().strip()
         pwd = self.edit_pwd.text().strip()
-        if DBManager.verify_user(user, pwd):
-            UserSession().login(user)
-            self.accept()
-        else:
-            QMessageBox.warning(self, "錯誤", "帳號或密碼錯誤")
+
+        def done(ok):
+            if ok:
+                UserSession().login(user)
+                self.accept()
+            else:
+                QMessageBox.warning(self, "錯誤", "帳號或密碼錯誤")
+        self.run_in_background(DBManager.verify_user, (user, pwd), done)
 
     def handle_register(self):
         user = self.edit_user.text().strip()
         pwd = self.edit_pwd.text().strip()
-        success, msg = DBManager.register_user(user, pwd)
-        if success:
-            QMessageBox.information(self, "成功", "註冊成功，請登入")
-        else:
-            QMessageBox.warning(self, "失敗", msg)
+
+        def done(result):
+            success, msg = result
+            if success:
+                QMessageBox.information(self, "成功", "註冊成功，請登入")
+            else:
+                QMessageBox.warning(self, "失敗", msg)
+        self.run_in_background(DBManager.register_user, (user, pwd), done)
 
 
 # ========= 填空模式 =========
 class FillQuizWindow(QWidget):
-    def __init__(self, num_questions=5):
+    def __init__(self, num_questions=5, strategy=None, mode="填空"):
         super().__init__()
-        self.num_questions = num_questions
-        self.current_index = 0
-        self.score = 0
-        self.question_list = []
-        self.strategy = FillQuizStrategy()  # 使用策略
-        self.init_data()
+        # 題目、計分與存檔由 QuizSession 負責，視窗只負責顯示
+        # mode 是存成績用的模式名稱（間隔複習也用填空畫面）
+        self.session = QuizSession(strategy or FillQuizStrategy(), mode, num_questions)
         self.init_ui()
         self.load_question()
 
-    def init_data(self):
-        # 使用策略產生題目，格式 [{"zh": ..., "en": ...}, ...]
-        self.question_list = self.strategy.generate_questions(self.num_questions)
-
-
     def init_ui(self):
-        self.setWindowTitle(f"填空模式 - 玩家: {UserSession().get_user()}")
+        self.setWindowTitle(f"{self.session.mode}模式 - 玩家: {UserSession().get_user()}")
         self.setFixedSize(550, 400) # 加大一點給 AI 文字
 
         self.label_word = QLabel("")
@@ -297,32 +498,41 @@ class FillQuizWindow(QWidget):
         self.setLayout(layout)
 
     def load_question(self):
-        if self.current_index >= self.num_questions:
+        word = self.session.current()
+        if word is None:
             self.show_final_result()
             return
-        word = self.question_list[self.current_index]
         self.label_word.setText(word["zh"])
         self.label_feedback.setText("")
         self.edit_answer.clear()
 
     def show_ai_help(self):
         """呼叫 AI API"""
-        if self.current_index >= len(self.question_list): return
+        word = self.session.current()
+        if word is None: return
         
-        current_word_en = self.question_list[self.current_index]["en"]
+        current_word_en = word["en"]
         self.label_feedback.setText("🤖 AI 正在思考中...")
-        self.repaint() # 強制刷新介面
-        
-        explanation = get_ai_explanation(current_word_en)
-        QMessageBox.information(self, f"{current_word_en} - AI 解說", explanation)
-        self.label_feedback.setText("")
+        # 背景查詢，結果回來時才呼叫 on_ai_ready，畫面不會凍結
+        AIExplanationService.instance().request(self, current_word_en, self.on_ai_ready)
+
+    def on_ai_ready(self, word, explanation):
+        if self.label_feedback.text() == "🤖 AI 正在思考中...":
+            self.label_feedback.setText("")
+        QMessageBox.information(self, f"{word} - AI 解說", explanation)
+
+    def closeEvent(self, event):
+        AIExplanationService.instance().cancel(self)
+        self.session.close()        # 沒做完就關閉時，也要寫入已作答單字的複習進度
+        answer_log.request_flush()  # 視窗關閉時請背景執行緒把作答紀錄寫入
+        super().closeEvent(event)
 
     def check_answer(self):
-        user_input = normalize(self.edit_answer.text())
-        correct = normalize(self.question_list[self.current_index]["en"])
+        word = self.session.current()
+        if word is None: return
+        correct = normalize(word["en"])
         
-        if user_input == correct:
-            self.score += 1
+        if self.session.answer(self.edit_answer.text()):
             self.label_feedback.setText("✔ 正確！")
             self.label_feedback.setStyleSheet("color: green;")
         else:
@@ -330,13 +540,13 @@ class FillQuizWindow(QWidget):
             self.label_feedback.setStyleSheet("color: red;")
 
     def next_question(self):
-        self.current_index += 1
+        self.session.next()
         self.load_question()
 
     def show_final_result(self):
         # 自動存入資料庫，不需要再手動輸入名字
-        DBManager.save_score("填空", self.score, self.num_questions)
-        QMessageBox.information(self, "結果", f"得分：{self.score}/{self.num_questions}")
+        score, total = self.session.finish()
+        QMessageBox.information(self, "結果", f"得分：{score}/{total}")
         self.close()
 
 # ========= 選擇題模式 =========
@@ -344,21 +554,12 @@ class FillQuizWindow(QWidget):
 class ChoiceQuizWindow(QWidget):
     def __init__(self, num_questions=5):
         super().__init__()
-        self.num_questions = num_questions
-        self.current_index = 0
-        self.score = 0
-        self.question_list = []
         self.btn_options = []
-        self.strategy = ChoiceQuizStrategy()  # 使用策略
-        self.init_data()
+        # 使用策略產生題目，含 options；每題格式：{"zh": ..., "en": ..., "options": [...]}
+        self.session = QuizSession(ChoiceQuizStrategy(), "選擇題", num_questions)
         self.init_ui()
         self.load_question()
 
-    def init_data(self):
-        # 使用策略產生題目，含 options
-        # 每題格式：{"zh": ..., "en": ..., "options": [...]}
-        self.question_list = self.strategy.generate_questions(self.num_questions)
-
     def init_ui(self):
         self.setWindowTitle(f"選擇題模式 - 玩家: {UserSession().get_user()}")
         self.setFixedSize(500, 450)
@@ -396,11 +597,11 @@ class ChoiceQuizWindow(QWidget):
         self.setLayout(layout)
 
     def load_question(self):
-        if self.current_index >= self.num_questions:
+        word = self.session.current()
+        if word is None:
             self.show_final_result()
             return
 
-        word = self.question_list[self.current_index]
         self.correct_answer = word["en"]
         self.label_word.setText(word["zh"])
         self.label_feedback.setText("")
@@ -413,19 +614,27 @@ class ChoiceQuizWindow(QWidget):
             btn.setStyleSheet("")
 
     def show_ai_help(self):
-        if self.current_index >= len(self.question_list):
+        word = self.session.current()
+        if word is None:
             return
-        current_word_en = self.question_list[self.current_index]["en"]
+        current_word_en = word["en"]
         self.label_feedback.setText("🤖 AI 正在思考中...")
-        self.repaint()
-        explanation = get_ai_explanation(current_word_en)
+        AIExplanationService.instance().request(self, current_word_en, self.on_ai_ready)
+
+    def on_ai_ready(self, word, explanation):
+        if self.label_feedback.text() == "🤖 AI 正在思考中...":
+            self.label_feedback.setText("")
         QMessageBox.information(self, "AI 解說", explanation)
-        self.label_feedback.setText("")
+
+    def closeEvent(self, event):
+        AIExplanationService.instance().cancel(self)
+        self.session.close()        # 沒做完就關閉時，也要寫入已作答單字的複習進度
+        answer_log.request_flush()  # 視窗關閉時請背景執行緒把作答紀錄寫入
+        super().closeEvent(event)
 
     def on_option_clicked(self):
         sender = self.sender()
-        if sender.text() == self.correct_answer:
-            self.score += 1
+        if self.session.answer(sender.text()):
             self.label_feedback.setText("✔ 正確！")
             sender.setStyleSheet("background-color: #a5d6a7;")  # 綠色
         else:
@@ -436,48 +645,166 @@ class ChoiceQuizWindow(QWidget):
             btn.setEnabled(False)
 
     def next_question(self):
-        self.current_index += 1
+        self.session.next()
         self.load_question()
 
     def show_final_result(self):
-        DBManager.save_score("選擇題", self.score, self.num_questions)
-        QMessageBox.information(self, "結果", f"得分：{self.score}/{self.num_questions}")
+        score, total = self.session.finish()
+        QMessageBox.information(self, "結果", f"得分：{score}/{total}")
         self.close()
 
 
 # ========= 排行榜 (資料庫版) =========
+class RankingModel(QAbstractTableModel):
+    """
+    排行榜的 table model：捲動到底時才向資料庫多讀一頁 (canFetchMore / fetchMore)，
+    每個 (排名方式, 期間, 模式) 讀過的頁面各自保留，切換回來不必重新查詢。
+    """
+    SCORE_HEADERS = ["排名", "玩家", "模式", "分數", "正確率"]
+    STATS_HEADERS = ["排名", "玩家", "模式", "最佳分數", "最佳正確率", "平均正確率", "作答次數"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # (排名方式, 期間, 模式) -> {"rows": [...], "after": (percent, score, id), "done": bool, "loading": bool}
+        self.pages = {}
+        self._jobs = set()
+        self.set_query("scores", None, None)
+
+    def set_query(self, view, period, mode_filter):
+        self.beginResetModel()
+        self.view, self.period, self.mode_filter = view, period, mode_filter
+        self.headers = self.SCORE_HEADERS if view == "scores" else self.STATS_HEADERS
+        self.current = self.pages.setdefault((view, period, mode_filter),
+                                             {"rows": [], "after": None, "done": False, "loading": False})
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.current["rows"])
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        row = index.row()
+        r = self.current["rows"][row]
+        values = [str(row + 1), r["name"], r["mode"],
+                  f"{r['score']}/{r['total']}", f"{r['percent']:.1f}%"]
+        if self.view != "scores":
+            values += [f"{r['average']:.1f}%", str(r["attempts"])]
+        return values[index.column()]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.current["done"] and not self.current["loading"]
+
+    def fetchMore(self, parent=QModelIndex()):
+        state = self.current
+        args = (self.view, self.period, self.mode_filter, state["after"], len(state["rows"]))
+        if DBManager.sync is None:
+            self._add_page(state, self._load_page(*args))
+            return
+        # 連到成績伺服器時改在 QThreadPool 查詢，網路延遲或斷線不會卡住畫面
+        state["loading"] = True
+        signals = _BackgroundJobSignals()
+        self._jobs.add(signals)  # 保留參照，結果送回來之前不能被回收
+
+        def finished(page):
+            self._jobs.discard(signals)
+            state["loading"] = False
+            self._add_page(state, [] if isinstance(page, Exception) else page)
+        signals.done.connect(finished)
+        QThreadPool.globalInstance().start(_BackgroundJob(self._load_page, args, signals))
+
+    @staticmethod
+    def _load_page(view, period, mode_filter, after, offset):
+        if view != "scores" or period is not None:
+            # 個人統計與今日 / 本週：資料量是玩家數或期間內的成績數，用 OFFSET 分頁即可
+            return DBManager.get_ranking(view, period, mode_filter, RANKING_PAGE_SIZE, offset=offset)
+        if after is None:
+            # 第一頁就是前幾名：走 get_top_scores，重複開啟排行榜時直接由快取回應
+            return DBManager.get_top_scores(mode_filter, RANKING_PAGE_SIZE)
+        return DBManager.get_score_page(mode_filter, after)
+
+    def _add_page(self, state, page):
+        """把讀到的一頁接在 state 後面；背景查詢回來時使用者可能已切到別的排名，只更新資料不通知畫面"""
+        if len(page) < RANKING_PAGE_SIZE:
+            state["done"] = True
+        if not page:
+            return
+        rows = state["rows"]
+        visible = state is self.current
+        if visible:
+            self.beginInsertRows(QModelIndex(), len(rows), len(rows) + len(page) - 1)
+        rows.extend(page)
+        if "id" in page[-1]:
+            last = page[-1]
+            state["after"] = (last["percent"], last["score"], last["id"])
+        if visible:
+            self.endInsertRows()
+
+
 class RankingDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("排行榜 (Top 20)")
-        self.resize(600, 400)
+        self.setWindowTitle("排行榜")
+        self.resize(700, 450)
         
+        # 排名方式 / 期間 / 模式，選項的 data 是傳給 DBManager 的鍵
+        self.combo_view = QComboBox()
+        for key, label in RANKING_VIEWS.items():
+            self.combo_view.addItem(label, key)
+        self.combo_period = QComboBox()
+        for key, label in RANKING_PERIODS.items():
+            self.combo_period.addItem(label, key)
         self.combo_mode = QComboBox()
-        self.combo_mode.addItems(["全部", "填空", "選擇題"])
-        self.combo_mode.currentIndexChanged.connect(self.refresh_table)
+        self.combo_mode.addItem(ALL_MODES)
+        self.load_modes()
+        for combo in [self.combo_view, self.combo_period, self.combo_mode]:
+            combo.currentIndexChanged.connect(self.refresh_table)
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["排名", "玩家", "模式", "分數", "正確率"])
+        self.model = RankingModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(24)  # 固定列高，捲動時不必逐列量測
         
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("排名方式："))
+        filter_layout.addWidget(self.combo_view)
+        filter_layout.addWidget(QLabel("期間："))
+        filter_layout.addWidget(self.combo_period)
+        filter_layout.addWidget(QLabel("篩選模式："))
+        filter_layout.addWidget(self.combo_mode)
+
         layout = QVBoxLayout()
-        layout.addWidget(QLabel("篩選模式："))
-        layout.addWidget(self.combo_mode)
+        layout.addLayout(filter_layout)
         layout.addWidget(self.table)
         self.setLayout(layout)
         
         self.refresh_table()
 
+    def load_modes(self):
+        """模式清單；連到成績伺服器時在背景查詢，查回來再加進下拉選單"""
+        if DBManager.sync is None:
+            self.combo_mode.addItems(DBManager.get_modes())
+            return
+        self._modes_signals = _BackgroundJobSignals()
+
+        def finished(modes):
+            if not isinstance(modes, Exception):
+                self.combo_mode.addItems(modes)
+        self._modes_signals.done.connect(finished)
+        QThreadPool.globalInstance().start(_BackgroundJob(DBManager.get_modes, (), self._modes_signals))
+
     def refresh_table(self):
         mode = self.combo_mode.currentText()
-        if mode == "全部": mode = None
-        
-        records = DBManager.get_top_scores(mode)
-        self.table.setRowCount(len(records))
+        if mode == ALL_MODES: mode = None
         
-        for i, r in enumerate(records):
-            self.table.setItem(i, 0, QTableWidgetItem(str(i+1)))
-            self.table.setItem(i, 1, QTableWidgetItem(r['name']))
-            self.table.setItem(i, 2, QTableWidgetItem(r['mode']))
-            self.table.setItem(i, 3, QTableWidgetItem(f"{r['score']}/{r['total']}"))
-            self.table.setItem(i, 4, QTableWidgetItem(f"{r['percent']:.1f}%"))
\ No newline at end of file
+        self.model.set_query(self.combo_view.currentData(), self.combo_period.currentData(), mode)
+        self.table.scrollToTop()